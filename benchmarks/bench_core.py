@@ -0,0 +1,175 @@
+"""
+Benchmarks utils_files/utils_data hot paths, printing time and peak memory as JSON.
+
+Usage:
+    python benchmarks/bench_core.py [--sizes 10000 100000] [--output FILE]
+    python benchmarks/bench_core.py --baseline FILE [--tolerance 0.2]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Callable
+
+# progress bars would dominate the timings of the walkers
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+from utils_python.utils_data import (
+    deduplicate,
+    flatten,
+    iter_flatten,
+    serialize_data,
+    stringify_keys,
+)
+from utils_python.utils_files import (
+    dump_data,
+    read_dict_from_file,
+    read_list_from_file,
+    rotate_file,
+    run_on_path,
+    run_on_path_flat,
+)
+
+
+def measure(fn: Callable[[], Any]) -> dict[str, float]:
+    """
+    Times `fn` without tracemalloc (which slows allocation-heavy code several-fold),
+     then runs it again under tracemalloc to get its peak memory
+    """
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    tracemalloc.start()
+    try:
+        fn()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(seconds, 6), "peak_bytes": peak}
+
+
+def make_tree(root: Path, n_files: int, files_per_dir: int = 20) -> Path:
+    for i in range(n_files):
+        directory = (
+            root / f"d{i // files_per_dir // files_per_dir}" / f"d{i // files_per_dir}"
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"f{i}.txt").touch()
+    return root
+
+
+def make_nested(size: int) -> dict[Any, Any]:
+    """nested dict of roughly `size` leaves, with non-string keys"""
+    width = max(1, int(size**0.5))
+    return {
+        i: {(i, j): {"value": j, 1.5: [j, str(j)]} for j in range(width)}
+        for i in range(max(1, size // width))
+    }
+
+
+def bench_size(directory: Path, size: int, dedup_max: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+
+    tree_size = min(size, 100_000)
+    tree = make_tree(directory / "tree", tree_size)
+    results[f"run_on_path[{tree_size}]"] = measure(
+        lambda: run_on_path(tree, file_callback=str)
+    )
+    results[f"run_on_path_flat[{tree_size}]"] = measure(
+        lambda: run_on_path_flat(tree, file_callback=str)
+    )
+
+    nested = make_nested(size)
+    results["serialize_data"] = measure(lambda: serialize_data(nested))
+    results["stringify_keys"] = measure(lambda: stringify_keys(nested))
+    results["dump_data"] = measure(lambda: dump_data(nested, directory / "dump.json"))
+
+    list_path = directory / "list.txt"
+    list_path.write_text("\n".join(str(i % (size // 2 or 1)) for i in range(size)))
+    results["read_list_from_file"] = measure(
+        lambda: read_list_from_file(list_path, deduplicate_list=False)
+    )
+    dict_path = directory / "dict.json"
+    dict_path.write_text(json.dumps({str(i): i for i in range(size)}))
+    results["read_dict_from_file"] = measure(lambda: read_dict_from_file(dict_path))
+
+    # deduplicate is quadratic, so is capped separately
+    dedup_size = min(size, dedup_max)
+    items = [i % (dedup_size // 2 or 1) for i in range(dedup_size)]
+    results[f"deduplicate[{dedup_size}]"] = measure(lambda: deduplicate(items))
+
+    lists = [list(range(100)) for _ in range(max(1, size // 100))]
+    results["flatten"] = measure(lambda: flatten(lists))
+    results["iter_flatten"] = measure(lambda: list(iter_flatten(lists)))
+
+    rotate_path = directory / "rotate.log"
+
+    def rotate_many():
+        for _ in range(100):
+            rotate_path.touch()
+            rotate_file(rotate_path, maximum_rotations=10)
+
+    results["rotate_file[100]"] = measure(rotate_many)
+    return results
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    """returns descriptions of benchmarks more than `tolerance` slower than baseline"""
+    regressions = []
+    for size, size_results in results["sizes"].items():
+        for name, result in size_results.items():
+            base = baseline.get("sizes", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            for metric in ("seconds", "peak_bytes"):
+                if base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{name} (size {size}) {metric}: "
+                        f"{base[metric]} -> {result[metric]}"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dedup-max", type=int, default=10_000)
+    parser.add_argument("--output", type=Path, help="save results as a baseline")
+    parser.add_argument("--baseline", type=Path, help="compare against saved results")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {"python": platform.python_version(), "sizes": {}}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            results["sizes"][str(size)] = bench_size(Path(tmp), size, args.dedup_max)
+
+    output = json.dumps(results, indent=4)
+    if args.output is not None:
+        args.output.write_text(output)
+    print(output)
+
+    if args.baseline is not None:
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark comparing log formatter throughput.
+
+Usage: python benchmarks/bench_logging.py [--records N]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from argparse import ArgumentParser
+
+from utils_python.utils_logging import (
+    LOG_DATEFMT,
+    LOG_FORMAT,
+    FastFormatter,
+    JsonLinesFormatter,
+)
+
+
+def make_records(n: int) -> list[logging.LogRecord]:
+    logger = logging.getLogger("bench")
+    start = time.time()
+    records = []
+    for i in range(n):
+        record = logger.makeRecord(
+            "bench", logging.INFO, __file__, i, "record %d of %s", (i, n), None
+        )
+        # spread records over ~10 seconds, as at ~n/10 logs/sec
+        record.created = start + i * 10 / n
+        record.msecs = (record.created - int(record.created)) * 1000
+        records.append(record)
+    return records
+
+
+def time_formatter(formatter: logging.Formatter, records: list[logging.LogRecord]):
+    t0 = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+
+    formatters = {
+        "logging.Formatter": logging.Formatter(fmt=LOG_FORMAT, datefmt=LOG_DATEFMT),
+        "FastFormatter": FastFormatter(fmt=LOG_FORMAT, datefmt=LOG_DATEFMT),
+        "JsonLinesFormatter": JsonLinesFormatter(datefmt=LOG_DATEFMT),
+    }
+    results = {}
+    for name, formatter in formatters.items():
+        seconds = time_formatter(formatter, records)
+        results[name] = {
+            "seconds": round(seconds, 4),
+            "records_per_second": round(len(records) / seconds),
+        }
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmarks utils_media tag reads/writes on synthetic files, printing JSON results.
+
+Usage: python benchmarks/bench_media.py [--files 10 100] [--tags 1 5 10] [--output FILE]
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Callable
+
+from media_fixtures import make_mp3, make_mp4
+
+from utils_python.utils_media import (
+    ensure_key_registered,
+    get_tag_text_id3,
+    get_tag_text_mp4,
+    get_tag_text_mp4_multi,
+    set_tag_text_id3,
+    set_tag_text_mp4,
+)
+
+
+def time_ops(fn: Callable[[], Any], ops: int) -> dict[str, float]:
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    return {
+        "ops": ops,
+        "seconds": round(seconds, 6),
+        "ops_per_second": round(ops / seconds, 1) if seconds else float("inf"),
+    }
+
+
+def total_size(paths: list[Path]) -> int:
+    return sum(path.stat().st_size for path in paths)
+
+
+def make_files(directory: Path, kind: str, n_files: int) -> list[Path]:
+    if kind == "mp4":
+        return [make_mp4(directory / f"{i}.m4a") for i in range(n_files)]
+    id3_padding = 1024 if kind == "mp3_id3" else None
+    return [
+        make_mp3(directory / f"{i}.mp3", id3_padding=id3_padding)
+        for i in range(n_files)
+    ]
+
+
+def bench_kind(directory: Path, kind: str, n_files: int, n_tags: int) -> dict[str, Any]:
+    keys = [f"bench_key_{i}" for i in range(n_tags)]
+    for key in keys:
+        ensure_key_registered(key)
+    paths = make_files(directory, kind, n_files)
+    if kind == "mp4":
+        get_fn, set_fn = get_tag_text_mp4, set_tag_text_mp4
+    else:
+        get_fn, set_fn = get_tag_text_id3, set_tag_text_id3
+    ops = n_files * n_tags
+    size_before = total_size(paths)
+
+    def set_all():
+        for path in paths:
+            for key in keys:
+                set_fn(path, key, f"{key} value")
+
+    def get_all():
+        for path in paths:
+            for key in keys:
+                get_fn(path, key)
+
+    def get_all_multi():
+        for path in paths:
+            for key in keys:
+                get_tag_text_mp4_multi(path, key)
+
+    results: dict[str, Any] = {"files": n_files, "tags": n_tags}
+    results[set_fn.__name__] = time_ops(set_all, ops)
+    results[set_fn.__name__]["saved_bytes"] = total_size(paths) - size_before
+    results[get_fn.__name__] = time_ops(get_all, ops)
+    if kind == "mp4":
+        results["get_tag_text_mp4_multi"] = time_ops(get_all_multi, ops)
+    return results
+
+
+def bench_ensure_key_registered(n: int = 100_000) -> dict[str, float]:
+    ensure_key_registered("bench_key_0")
+
+    def run():
+        for _ in range(n):
+            ensure_key_registered("bench_key_0")
+
+    return time_ops(run, n)
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--files", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--tags", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {
+        "python": platform.python_version(),
+        "ensure_key_registered": bench_ensure_key_registered(),
+        "mp3_no_id3": [],
+        "mp3_id3": [],
+        "mp4": [],
+    }
+    for n_files in args.files:
+        for n_tags in args.tags:
+            for kind in ("mp3_no_id3", "mp3_id3", "mp4"):
+                with tempfile.TemporaryDirectory() as tmp:
+                    results[kind].append(bench_kind(Path(tmp), kind, n_files, n_tags))
+
+    output = json.dumps(results, indent=4)
+    if args.output is not None:
+        args.output.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
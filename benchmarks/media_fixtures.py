@@ -0,0 +1,49 @@
+"""
+Generates small synthetic MP3 and MP4 files for benchmarking, without any encoder.
+"""
+
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 417 byte frames
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+def _syncsafe(n: int) -> bytes:
+    return bytes((n >> shift) & 0x7F for shift in (21, 14, 7, 0))
+
+
+def make_mp3(filepath: Path, frames: int = 100, id3_padding: int | None = None) -> Path:
+    """MP3, with an empty ID3v2.4 header of `id3_padding` bytes if given"""
+    header = b""
+    if id3_padding is not None:
+        header = b"ID3\x04\x00\x00" + _syncsafe(id3_padding) + b"\x00" * id3_padding
+    filepath.write_bytes(header + MP3_FRAME * frames)
+    return filepath
+
+
+def _atom(name: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(data)) + name + data
+
+
+def make_mp4(filepath: Path, mdat_size: int = 40_000) -> Path:
+    """M4A with a minimal moov atom and no tags"""
+    ftyp = _atom(b"ftyp", b"M4A \x00\x00\x02\x00M4A isomiso2")
+    identity_matrix = struct.pack(">9I", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    mvhd = _atom(
+        b"mvhd",
+        b"\x00" * 4  # version, flags
+        + b"\x00" * 8  # creation, modification time
+        + struct.pack(">II", 1000, 1000)  # timescale, duration
+        + struct.pack(">IH", 0x10000, 0x100)  # rate, volume
+        + b"\x00" * 10
+        + identity_matrix
+        + b"\x00" * 24
+        + struct.pack(">I", 2),  # next track ID
+    )
+    filepath.write_bytes(
+        ftyp + _atom(b"moov", mvhd) + _atom(b"mdat", b"\x00" * mdat_size)
+    )
+    return filepath
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# lets tests share the synthetic media files of `benchmarks/media_fixtures.py`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
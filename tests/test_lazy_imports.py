@@ -0,0 +1,84 @@
+import ast
+import importlib
+import inspect
+import pkgutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LAZY_PACKAGES = ["utils_python", "utils_python.utils_files", "utils_python.utils_media"]
+HEAVY_MODULES = ["requests", "mutagen", "tqdm", "filedate"]
+IMPORT_BUDGET_MS = 50.0
+
+
+def get_defined_names(module) -> set[str]:
+    """public names assigned, or defined with def/class, at the top level of `module`"""
+    names = set()
+    for node in ast.parse(inspect.getsource(module)).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+    # every module's own logger, which isn't re-exported
+    names.discard("LOGGER")
+    return {name for name in names if not name.startswith("_")}
+
+
+def iter_submodules():
+    for package_name in LAZY_PACKAGES:
+        package = importlib.import_module(package_name)
+        for info in pkgutil.iter_modules(package.__path__):
+            if not info.name.startswith("_"):
+                yield pytest.param(package, info, id=f"{package_name}.{info.name}")
+
+
+@pytest.mark.parametrize(("package", "info"), list(iter_submodules()))
+def test_lazy_all_lists_every_public_name(package, info):
+    module = importlib.import_module(f"{package.__name__}.{info.name}")
+    expected = set(module.__all__) if info.ispkg else get_defined_names(module)
+    assert expected - set(package.__all__) == set()
+
+
+@pytest.mark.parametrize("package_name", LAZY_PACKAGES)
+def test_lazy_all_names_resolve(package_name):
+    package = importlib.import_module(package_name)
+    for name in package.__all__:
+        # raises if the name is mapped to the wrong submodule
+        getattr(package, name)
+    assert not hasattr(package, "missing_attribute")
+
+
+def import_times_us(module: str) -> dict[str, int]:
+    """cumulative import time (in microseconds) of each module imported by `module`"""
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {module}; hasattr({module}, 'missing_attribute')",
+        ],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def test_bare_import_is_within_budget():
+    runs = [import_times_us("utils_python") for _ in range(5)]
+    assert [module for module in HEAVY_MODULES if module in runs[0]] == []
+    best_ms = min(times["utils_python"] for times in runs) / 1000
+    assert best_ms <= IMPORT_BUDGET_MS
@@ -0,0 +1,29 @@
+from media_fixtures import make_mp3
+
+from utils_python.utils_media.index import index_tags, open_tag_index, scan_tags
+
+
+def test_index_tags_removes_vanished_files(tmp_path):
+    conn = open_tag_index(tmp_path / "index.sqlite")
+    song = make_mp3(tmp_path / "song.mp3")
+    assert index_tags(conn, [song]) == 1
+    song.unlink()
+    assert index_tags(conn, [song, tmp_path / "never-existed.mp3"]) == 0
+    assert conn.execute("SELECT COUNT(*) FROM files").fetchone() == (0,)
+
+
+def test_scan_tags_indexes_and_removes(tmp_path):
+    music = tmp_path / "music"
+    (music / "album").mkdir(parents=True)
+    for name in ("a.mp3", "b.mp3"):
+        make_mp3(music / "album" / name)
+    (music / "cover.jpg").write_bytes(b"")
+    conn = scan_tags(music, tmp_path / "index.sqlite")
+    assert conn.execute("SELECT COUNT(*) FROM files").fetchone() == (2,)
+    conn.close()
+    (music / "album" / "a.mp3").unlink()
+    conn = scan_tags(music, tmp_path / "index.sqlite")
+    assert [row[0] for row in conn.execute("SELECT path FROM files")] == [
+        str((music / "album" / "b.mp3").resolve())
+    ]
+    conn.close()
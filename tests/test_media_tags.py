@@ -0,0 +1,71 @@
+import pytest
+from media_fixtures import make_mp3, make_mp4
+from mutagen.easyid3 import EasyID3
+from mutagen.easymp4 import EasyMP4
+
+from utils_python.utils_media import get_tag, get_tags, header_tags
+from utils_python.utils_media.header_tags import read_tags_fast
+
+COMMON_TAGS = {
+    "title": ["Title"],
+    "artist": ["Artist", "Other Artist"],
+    "album": ["Album"],
+    "tracknumber": ["3/10"],
+    "genre": ["Rock"],
+    "date": ["2020-01-02"],
+}
+ID3_MISC_TAGS = {
+    "originaldate": ["1999"],
+    "musicbrainz_trackid": ["5a4d1c1e-0000-4000-8000-000000000000"],
+    "website": ["https://example.com"],
+    "replaygain_track_gain": ["-3.5 dB"],
+    "performer:guitar": ["Guitarist"],
+}
+
+
+@pytest.fixture
+def headerless_mp3(tmp_path):
+    return make_mp3(tmp_path / "song.mp3")
+
+
+def tag_mp3(path, tags, v2_version=4):
+    id3 = EasyID3()
+    id3.update(tags)
+    id3.save(path, v2_version=v2_version)
+    return path
+
+
+def test_get_tags_without_id3_header_uses_default(headerless_mp3):
+    assert get_tag(headerless_mp3, "title", "-") == "-"
+    assert get_tags(headerless_mp3, ["title", "artist"], "-") == {
+        "title": "-",
+        "artist": "-",
+    }
+    with pytest.raises(KeyError):
+        get_tags(headerless_mp3, ["title"], required=True)
+
+
+def test_read_tags_fast_matches_mutagen_for_common_tags(tmp_path, monkeypatch):
+    mp3 = tag_mp3(make_mp3(tmp_path / "song.mp3"), COMMON_TAGS)
+    m4a = make_mp4(tmp_path / "song.m4a")
+    mp4 = EasyMP4(m4a)
+    mp4.update(COMMON_TAGS)
+    mp4.save()
+
+    def fail(*args):
+        raise AssertionError("fell back to mutagen")
+
+    # genre and date are decoded by the fast reader itself
+    monkeypatch.setattr(header_tags, "_read_tags_mutagen", fail)
+    assert read_tags_fast(mp3) == dict(EasyID3(mp3)) == COMMON_TAGS
+    assert read_tags_fast(m4a) == dict(EasyMP4(m4a)) == COMMON_TAGS
+
+
+@pytest.mark.parametrize("v2_version", [3, 4])
+def test_read_tags_fast_matches_mutagen_for_id3_misc_tags(tmp_path, v2_version):
+    mp3 = tag_mp3(
+        make_mp3(tmp_path / "song.mp3"), {**COMMON_TAGS, **ID3_MISC_TAGS}, v2_version
+    )
+    expected = dict(EasyID3(mp3))
+    assert read_tags_fast(mp3) == expected
+    assert expected.keys() >= {"genre", "date", "originaldate", "website"}
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from utils_python.utils_files import mirror
+from utils_python.utils_files.mirror import mirror_tree
+
+
+@pytest.fixture
+def src_dir(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.txt").write_text("new a")
+    (src / "sub" / "b.txt").write_text("new b")
+    os.symlink("a.txt", src / "link")
+    return src
+
+
+def test_mirror_tree_copies_tree(src_dir, tmp_path):
+    dst = tmp_path / "dst"
+    stats = mirror_tree(src_dir, dst, progress=False)
+    assert stats.copied == 3
+    assert (dst / "sub" / "b.txt").read_text() == "new b"
+    assert os.readlink(dst / "link") == "a.txt"
+    assert os.stat(dst / "a.txt").st_mtime_ns == os.stat(src_dir / "a.txt").st_mtime_ns
+    assert mirror_tree(src_dir, dst, progress=False).copied == 0
+
+
+def test_mirror_tree_does_not_write_through_hardlinks(src_dir, tmp_path):
+    dst = tmp_path / "dst"
+    dst.mkdir()
+    (dst / "a.txt").write_text("old a")
+    os.link(dst / "a.txt", tmp_path / "other-link")
+    mirror_tree(src_dir, dst, progress=False)
+    assert (dst / "a.txt").read_text() == "new a"
+    assert (tmp_path / "other-link").read_text() == "old a"
+
+
+def test_mirror_tree_keeps_old_file_when_copy_fails(src_dir, tmp_path, monkeypatch):
+    dst = tmp_path / "dst"
+    (dst / "sub").mkdir(parents=True)
+    (dst / "sub" / "b.txt").write_text("old b")
+
+    def fail_copy(src, dst, size):
+        with open(dst, "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(mirror, "_copy_file_contents", fail_copy)
+    with pytest.raises(OSError):
+        mirror_tree(src_dir, dst, workers=1, progress=False)
+    assert (dst / "sub" / "b.txt").read_text() == "old b"
+    assert sorted(os.listdir(dst / "sub")) == ["b.txt"]
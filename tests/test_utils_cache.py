@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from utils_python.utils_cache import make_cache_key, memoize_to_disk
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize(
+    ("a", "b"),
+    [
+        ((1, 2), [1, 2]),
+        ({1: "a"}, {"1": "a"}),
+        (1, 1.0),
+        (1, True),
+        ("1", 1),
+        (None, "None"),
+        ({1, 2}, frozenset({1, 2})),
+        ({1, 2}, [1, 2]),
+        (b"a", "a"),
+    ],
+)
+def test_make_cache_key_distinguishes_types(a, b):
+    assert make_cache_key(a) != make_cache_key(b)
+
+
+def test_make_cache_key_distinguishes_args_and_kwargs():
+    assert make_cache_key(1) != make_cache_key(x=1)
+    assert make_cache_key(1, 2) != make_cache_key((1, 2))
+    assert make_cache_key(x=1, y=2) == make_cache_key(y=2, x=1)
+
+
+def test_make_cache_key_ignores_ordering():
+    assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+    assert make_cache_key({"x", "y", "z"}) == make_cache_key({"z", "y", "x"})
+
+
+def test_make_cache_key_is_stable_across_hash_seeds():
+    code = "from utils_python.utils_cache import make_cache_key; "
+    code += "print(make_cache_key({'a', 'b', 'c', 1, (2, 3)}, k=frozenset('xyz')))"
+    keys = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONHASHSEED": seed, "PYTHONPATH": str(REPO_ROOT)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("0", "1", "2")
+    }
+    assert len(keys) == 1
+
+
+def test_memoize_to_disk_does_not_share_results_between_colliding_types(tmp_path):
+    calls = []
+
+    @memoize_to_disk(tmp_path / "cache.sqlite")
+    def describe(value):
+        calls.append(value)
+        return type(value).__name__
+
+    assert describe((1, 2)) == "tuple"
+    assert describe([1, 2]) == "list"
+    assert describe({1: "a"}) == "dict"
+    assert describe({"1": "a"}) == "dict"
+    assert describe((1, 2)) == "tuple"
+    assert len(calls) == 4
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize(("profile", "expected"), [("", "False"), ("cprofile", "True")])
+def test_setup_logger_starts_profiling_from_env(profile, expected):
+    code = "from utils_python.utils_logging import setup_logger; "
+    code += "from utils_python.utils_profiling import is_profiling; "
+    code += "setup_logger(); print(is_profiling())"
+    process = subprocess.run(
+        [sys.executable, "-c", code],
+        env={
+            **os.environ,
+            "UTILS_PYTHON_PROFILE": profile,
+            "PYTHONPATH": str(REPO_ROOT),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert process.stdout.strip() == expected
+    # the report is logged at exit
+    assert ("Top functions" in process.stderr) == (expected == "True")
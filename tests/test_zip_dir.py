@@ -0,0 +1,74 @@
+import os
+import shutil
+import subprocess
+import zipfile
+
+import pytest
+
+from utils_python.utils_files import unzip, zip_dir
+
+
+@pytest.fixture
+def src_dir(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub" / "empty").mkdir(parents=True)
+    (src / "text.txt").write_text("\n".join(map(str, range(50_000))))
+    (src / "sub" / "small.txt").write_text("x")
+    (src / "sub" / "zero.txt").write_bytes(b"")
+    (src / "song.mp3").write_bytes(os.urandom(100_000))
+    return src
+
+
+def assert_round_trip(src_dir, zipped_file, tmp_path):
+    with zipfile.ZipFile(zipped_file) as zip_ref:
+        assert zip_ref.testzip() is None
+    if shutil.which("unzip"):
+        subprocess.run(["unzip", "-tq", zipped_file], check=True, capture_output=True)
+    out_dir = tmp_path / "out"
+    unzip(zipped_file, extract_dir=out_dir)
+    for path in src_dir.rglob("*"):
+        extracted = out_dir / path.relative_to(src_dir)
+        if path.is_dir():
+            assert extracted.is_dir()
+        else:
+            assert extracted.read_bytes() == path.read_bytes()
+
+
+def test_zip_dir_round_trip(src_dir, tmp_path):
+    zipped_file = zip_dir(src_dir, tmp_path / "out.zip", workers=2, progress=False)
+    assert_round_trip(src_dir, zipped_file, tmp_path)
+    with zipfile.ZipFile(zipped_file) as zip_ref:
+        assert zip_ref.getinfo("text.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zip_ref.getinfo("song.mp3").compress_type == zipfile.ZIP_STORED
+        assert "sub/empty/" in zip_ref.namelist()
+
+
+def test_zip_dir_zip64_members(src_dir, tmp_path, monkeypatch):
+    # as in CPython's own zipfile tests, lowering the limit exercises the ZIP64
+    #  code paths without writing 4 GiB members
+    monkeypatch.setattr(zipfile, "ZIP64_LIMIT", 1000)
+    zipped_file = zip_dir(src_dir, tmp_path / "out.zip", workers=2, progress=False)
+    with zipfile.ZipFile(zipped_file) as zip_ref:
+        info = zip_ref.getinfo("text.txt")
+        assert info.file_size > 1000
+        assert info.extract_version >= zipfile.ZIP64_VERSION
+    monkeypatch.undo()
+    assert_round_trip(src_dir, zipped_file, tmp_path)
+
+
+def test_zip_dir_no_progress_output(src_dir, tmp_path, capsys):
+    zip_dir(src_dir, tmp_path / "out.zip", workers=1, progress=False)
+    captured = capsys.readouterr()
+    assert captured.err == ""
+
+
+def test_unzip_with_workers_into_new_nested_dirs(tmp_path):
+    zipped_file = tmp_path / "nested.zip"
+    with zipfile.ZipFile(zipped_file, "w") as zip_ref:
+        for i in range(300):
+            for j in range(4):
+                zip_ref.writestr(f"a/{i}/b/{j}.txt", f"{i} {j}")
+    out_dir = tmp_path / "out"
+    unzip(zipped_file, extract_dir=out_dir, workers=8)
+    assert len(list(out_dir.rglob("*.txt"))) == 1200
+    assert (out_dir / "a" / "299" / "b" / "3.txt").read_text() == "299 3"
@@ -1,10 +1,178 @@
-from .utils_args import *
-from .utils_data import *
-from .utils_files import *
-from .utils_logging import *
-from .utils_main import *
-from .utils_media import *
-from .utils_requests import *
-from .utils_strings import *
-from .utils_tqdm import *
-from .utils_typing import *
+from typing import TYPE_CHECKING
+
+from ._lazy import lazy_attach
+
+if TYPE_CHECKING:
+    from .utils_args import *
+    from .utils_cache import *
+    from .utils_data import *
+    from .utils_files import *
+    from .utils_logging import *
+    from .utils_main import *
+    from .utils_media import *
+    from .utils_profiling import *
+    from .utils_requests import *
+    from .utils_strings import *
+    from .utils_tqdm import *
+    from .utils_typing import *
+
+__getattr__, __dir__, __all__ = lazy_attach(
+    __name__,
+    [
+        "utils_args",
+        "utils_cache",
+        "utils_data",
+        "utils_files",
+        "utils_logging",
+        "utils_main",
+        "utils_media",
+        "utils_profiling",
+        "utils_requests",
+        "utils_strings",
+        "utils_tqdm",
+        "utils_typing",
+    ],
+    {
+        "remove_none_type": "utils_args",
+        "BaseNamespace": "utils_args",
+        "make_cache_key": "utils_cache",
+        "DiskCache": "utils_cache",
+        "memoize_to_disk": "utils_cache",
+        "flatten": "utils_data",
+        "iter_flatten": "utils_data",
+        "sort_dict": "utils_data",
+        "deduplicate": "utils_data",
+        "is_iterable": "utils_data",
+        "stringify_keys": "utils_data",
+        "serialize_data": "utils_data",
+        "make_parent_dir": "utils_files",
+        "get_rotated_path": "utils_files",
+        "rotate_file": "utils_files",
+        "dump_data": "utils_files",
+        "run_on_paths": "utils_files",
+        "run_on_path_flat": "utils_files",
+        "count_paths": "utils_files",
+        "run_on_path": "utils_files",
+        "read_list_from_file": "utils_files",
+        "read_dict_from_file": "utils_files",
+        "write_at_exit": "utils_files",
+        "download": "utils_files",
+        "unzip": "utils_files",
+        "STORE_EXTENSIONS": "utils_files",
+        "zip_dir": "utils_files",
+        "cd": "utils_files",
+        "preserve_filedate": "utils_files",
+        "copy_filedate": "utils_files",
+        "update_filedate_created": "utils_files",
+        "update_filedate_modified": "utils_files",
+        "update_filedate_accessed": "utils_files",
+        "FileTimes": "utils_files",
+        "get_filedates": "utils_files",
+        "set_filedates": "utils_files",
+        "preserve_filedates": "utils_files",
+        "sanitize_filename_windows_style": "utils_files",
+        "create_windows_url_shortcut": "utils_files",
+        "EDGE_SIZE": "utils_files",
+        "find_duplicate_files": "utils_files",
+        "hardlink_duplicate_files": "utils_files",
+        "MirrorStats": "utils_files",
+        "mirror_tree": "utils_files",
+        "iter_path_changes": "utils_files",
+        "watch_path": "utils_files",
+        "LOG_DATEFMT": "utils_logging",
+        "LOG_FORMAT": "utils_logging",
+        "setup_root_logger": "utils_logging",
+        "DirCreatingFileHandler": "utils_logging",
+        "RotatingDirCreatingFileHandler": "utils_logging",
+        "setup_config_logging": "utils_logging",
+        "FolderCreatingFileHandler": "utils_logging",
+        "setup_logger": "utils_logging",
+        "logPrefixFilter": "utils_logging",
+        "LogContext": "utils_logging",
+        "log_context": "utils_logging",
+        "LogContextFilter": "utils_logging",
+        "LogContextFormatter": "utils_logging",
+        "FastFormatter": "utils_logging",
+        "JsonLinesFormatter": "utils_logging",
+        "RateLimitFilter": "utils_logging",
+        "get_logger_with_class": "utils_logging",
+        "noop": "utils_main",
+        "identity": "utils_main",
+        "get_platform": "utils_main",
+        "setup_excepthook": "utils_main",
+        "PROFILE_ENV_VAR": "utils_profiling",
+        "BlockTiming": "utils_profiling",
+        "profile_block": "utils_profiling",
+        "get_block_timings": "utils_profiling",
+        "reset_profiling": "utils_profiling",
+        "is_profiling": "utils_profiling",
+        "setup_profiling": "utils_profiling",
+        "log_crash_profiling_report": "utils_profiling",
+        "log_profiling_report": "utils_profiling",
+        "EasyID3TextKeys": "utils_media",
+        "EasyID3TXXXKeys": "utils_media",
+        "EasyID3MiscKeys": "utils_media",
+        "EasyID3Keys": "utils_media",
+        "ID3MiscFrameClasses": "utils_media",
+        "EasyMP4TextKeys": "utils_media",
+        "EasyMP4FreeformKeys": "utils_media",
+        "EasyMP4IntKeys": "utils_media",
+        "EasyMP4IntPairKeys": "utils_media",
+        "EasyMP4Keys": "utils_media",
+        "get_registered_keys_id3": "utils_media",
+        "ensure_key_registered_id3_txxx": "utils_media",
+        "get_tag_text_id3": "utils_media",
+        "get_tags_id3": "utils_media",
+        "edit_tags_id3": "utils_media",
+        "set_tag_text_id3": "utils_media",
+        "del_tag_text_id3": "utils_media",
+        "get_registered_keys_mp4": "utils_media",
+        "ensure_key_registered_mp4_freeform": "utils_media",
+        "get_tag_text_mp4": "utils_media",
+        "get_tags_mp4": "utils_media",
+        "edit_tags_mp4": "utils_media",
+        "set_tag_text_mp4": "utils_media",
+        "del_tag_text_mp4": "utils_media",
+        "get_tag_text_mp4_multi": "utils_media",
+        "TagTransaction": "utils_media",
+        "ID3_EXTENSIONS": "utils_media",
+        "MP4_EXTENSIONS": "utils_media",
+        "TagFormat": "utils_media",
+        "TAG_CACHE_SIZE": "utils_media",
+        "ensure_key_registered": "utils_media",
+        "sniff_tag_format": "utils_media",
+        "get_tag_format": "utils_media",
+        "clear_tag_cache": "utils_media",
+        "get_tag": "utils_media",
+        "get_tags": "utils_media",
+        "edit_tags": "utils_media",
+        "set_tag": "utils_media",
+        "del_tag": "utils_media",
+        "read_tags_fast": "utils_media",
+        "TAG_INDEX_SCHEMA": "utils_media",
+        "open_tag_index": "utils_media",
+        "read_all_tags": "utils_media",
+        "index_tags": "utils_media",
+        "remove_from_tag_index": "utils_media",
+        "scan_tags": "utils_media",
+        "watch_tags": "utils_media",
+        "find_files_with_tag": "utils_media",
+        "find_files_missing_tag": "utils_media",
+        "last_requests": "utils_requests",
+        "make_get_request_to_url": "utils_requests",
+        "str_upper": "utils_strings",
+        "truncate_str": "utils_strings",
+        "ensure_caps": "utils_strings",
+        "TqdmLoggingHandler": "utils_tqdm",
+        "BufferedTqdmLoggingHandler": "utils_tqdm",
+        "setup_tqdm_logger": "utils_tqdm",
+        "setup_buffered_tqdm_logger": "utils_tqdm",
+        "print_tqdm": "utils_tqdm",
+        "download_tqdm": "utils_tqdm",
+        "redirect_logging_to_tqdm": "utils_tqdm",
+        "tqdm_map": "utils_tqdm",
+        "C": "utils_typing",
+        "copy_signature": "utils_typing",
+        "PathInput": "utils_typing",
+    },
+)
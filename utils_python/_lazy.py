@@ -0,0 +1,43 @@
+"""
+PEP 562 lazy loading of package attributes, so that e.g. `from utils_python import
+ truncate_str` doesn't import requests, mutagen, tqdm etc.
+"""
+
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from typing import Any, Callable
+
+
+def lazy_attach(
+    package_name: str,
+    submodules: list[str],
+    attr_submodules: dict[str, str],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]], list[str]]:
+    """
+    Returns `__getattr__`, `__dir__` and `__all__` for a package whose attributes are
+     imported from `submodules` on first access, where `attr_submodules` maps
+     attribute names to the submodule defining them.
+
+    Names not in `attr_submodules` raise AttributeError without importing anything,
+     so probes like `hasattr(utils_python, name)` stay cheap; every public name must
+     therefore be listed there.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name in submodules:
+            return import_module(f"{package_name}.{name}")
+        if name not in attr_submodules:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        module = import_module(f"{package_name}.{attr_submodules[name]}")
+        value = getattr(module, name)
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    __all__ = list(attr_submodules)
+
+    def __dir__() -> list[str]:
+        return sorted({*__all__, *submodules})
+
+    return __getattr__, __dir__, __all__
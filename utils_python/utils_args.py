@@ -1,8 +1,9 @@
 import operator
-from argparse import ArgumentParser, Namespace
+from argparse import REMAINDER, ArgumentParser, Namespace
 from functools import reduce
+from importlib import import_module
 from types import GenericAlias, UnionType
-from typing import Any, Self
+from typing import Any, ClassVar, NamedTuple, Self, Sequence, get_origin
 
 
 def remove_none_type(tp: type[Any]) -> type[Any]:
@@ -20,55 +21,134 @@ def remove_none_type(tp: type[Any]) -> type[Any]:
         return tp
 
 
+class _ArgSpec(NamedTuple):
+    name: str
+    default: Any
+    flag: str
+    kwargs: dict[str, Any]
+
+
+def _get_annotations(cls: type) -> dict[str, Any]:
+    """
+    annotations of `cls` and its bases, with subclasses' annotations taking priority
+    """
+    annotations: dict[str, Any] = {}
+    for klass in reversed(cls.__mro__):
+        annotations.update(klass.__dict__.get("__annotations__", {}))
+    return {
+        attr_name: attr_type
+        for attr_name, attr_type in annotations.items()
+        if not attr_name.startswith("_") and get_origin(attr_type) is not ClassVar
+    }
+
+
+def _build_arg_specs(cls: type) -> list[_ArgSpec]:
+    specs = []
+    for attr_name, attr_type in _get_annotations(cls).items():
+        if hasattr(cls, attr_name):
+            default = getattr(cls, attr_name)
+            required = False
+        else:
+            default = None
+            required = True
+            if isinstance(attr_type, UnionType) and type(None) in attr_type.__args__:
+                required = False
+
+        type_without_none = remove_none_type(attr_type)
+        if isinstance(type_without_none, UnionType):
+            raise TypeError(f"UnionType ({type_without_none!r}) not supported for args")
+
+        flag = f"--{attr_name.replace('_', '-')}"
+        kwargs: dict[str, Any]
+        if attr_type is bool:
+            kwargs = {"action": f"store_{str(not default).lower()}"}
+        elif isinstance(attr_type, GenericAlias):
+            if attr_type.__origin__ == list:
+                kwargs = {
+                    "type": remove_none_type(attr_type.__args__[0]),
+                    "default": default,
+                    "nargs": "*" if default is not None else "+",
+                    "required": required,
+                    "help": "Default: %(default)r" if default else None,
+                }
+            else:
+                raise NotImplementedError(f"{attr_type=}")
+        else:
+            kwargs = {
+                "type": type_without_none,
+                "default": default,
+                "required": required,
+                "help": "Default: %(default)r" if default is not None else None,
+            }
+        specs.append(_ArgSpec(attr_name, default, flag, kwargs))
+    return specs
+
+
+_ARG_SPECS: dict[type, list[_ArgSpec]] = {}
+_PARSERS: dict[type, ArgumentParser] = {}
+
+
+def _resolve_subcommand(target: "str | type[BaseNamespace]") -> "type[BaseNamespace]":
+    if isinstance(target, str):
+        module_name, _, attr_name = target.partition(":")
+        return getattr(import_module(module_name), attr_name)
+    return target
+
+
 class BaseNamespace(Namespace):
+    """
+    Namespace whose arguments are defined by its (and its bases') annotations, e.g.
+     `count: int = 1` -> `--count`
+
+    Subcommands map names to BaseNamespace subclasses, or to "module:ClassName"
+     strings which are only imported if that subcommand is selected, e.g.
+     `__subcommands__ = {"scan": "mypackage.scan:ScanArgs"}`; the selected name and
+     parsed arguments are set as `command` and `command_args`.
+    """
+
+    __subcommands__: ClassVar[dict[str, "str | type[BaseNamespace]"]] = {}
+
+    @classmethod
+    def _get_arg_specs(cls) -> list[_ArgSpec]:
+        if cls not in _ARG_SPECS:
+            _ARG_SPECS[cls] = _build_arg_specs(cls)
+        return _ARG_SPECS[cls]
+
+    @classmethod
+    def add_arguments(cls, parser: ArgumentParser) -> ArgumentParser:
+        for spec in cls._get_arg_specs():
+            parser.add_argument(spec.flag, **spec.kwargs)
+        if cls.__subcommands__:
+            parser.add_argument("command", choices=list(cls.__subcommands__))
+            parser.add_argument("command_args", nargs=REMAINDER)
+        return parser
+
+    @classmethod
+    def get_parser(cls) -> ArgumentParser:
+        """returns an ArgumentParser for this class, built once and then reused"""
+        if cls not in _PARSERS:
+            _PARSERS[cls] = cls.add_arguments(ArgumentParser())
+        return _PARSERS[cls]
+
     @classmethod
-    def parse_args(cls, parser: ArgumentParser | None = None) -> Self:
+    def parse_args(
+        cls,
+        parser: ArgumentParser | None = None,
+        argv: Sequence[str] | None = None,
+    ) -> Self:
+        """
+        Parses `argv` (default: `sys.argv[1:]`) using the cached parser for this
+         class, or by adding this class' arguments to `parser` if given
+        """
         if parser is None:
-            parser = ArgumentParser()
+            parser = cls.get_parser()
+        else:
+            cls.add_arguments(parser)
         namespace = cls()
-        for attr_name, attr_type in cls.__annotations__.items():
-            if hasattr(cls, attr_name):
-                default = getattr(cls, attr_name)
-                required = False
-            else:
-                default = None
-                required = True
-                if isinstance(attr_type, UnionType) and type(None in attr_type.__args__):
-                    required = False
-
-            type_without_none = remove_none_type(attr_type)
-            if isinstance(type_without_none, UnionType):
-                raise TypeError(f"UnionType ({type_without_none!r}) not supported for args")
-
-            namespace.__dict__[attr_name] = default
-            if attr_type is bool:
-                parser.add_argument(
-                    f"--{attr_name.replace('_', '-')}",
-                    action=f"store_{str(not default).lower()}",
-                )
-            elif isinstance(attr_type, GenericAlias):
-                if attr_type.__origin__ == list:
-                    help = "Default: %(default)r" if default else None
-                    nargs = "*" if default is not None else "+"
-                    type_ = remove_none_type(attr_type.__args__[0])
-                    parser.add_argument(
-                        f"--{attr_name.replace('_', '-')}",
-                        type=type_,
-                        default=default,
-                        nargs=nargs,
-                        required=required,
-                        help=help,
-                    )
-                else:
-                    raise NotImplementedError(f"{attr_type=}")
-            else:
-                help = "Default: %(default)r" if default is not None else None
-                parser.add_argument(
-                    f"--{attr_name.replace('_', '-')}",
-                    type=type_without_none,
-                    default=default,
-                    required=required,
-                    help=help,
-                )
-        args = parser.parse_args(namespace=namespace)
+        for spec in cls._get_arg_specs():
+            namespace.__dict__[spec.name] = spec.default
+        args = parser.parse_args(argv, namespace=namespace)
+        if cls.__subcommands__:
+            subcommand_cls = _resolve_subcommand(cls.__subcommands__[args.command])
+            args.command_args = subcommand_cls.parse_args(argv=args.command_args)
         return args
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from utils_python.utils_files.base import make_parent_dir
+from utils_python.utils_typing import PathInput
+
+LOGGER = logging.getLogger(__name__)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value BLOB NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_namespace_accessed ON cache (namespace, accessed);
+"""
+
+# evict down to max_size once this much over it, so eviction is amortised O(1)
+_EVICTION_SLACK = 0.1
+
+
+def _canonicalize(obj: Any) -> Any:
+    """
+    Converts `obj` into nested tuples of strings that differ whenever the types or
+     values in `obj` do (so `(1, 2)`, `[1, 2]` and `{1: "a"}`, `{"1": "a"}` differ),
+     with dict items and set members sorted so the result is independent of
+     insertion order and `PYTHONHASHSEED`
+    """
+    obj_type = type(obj)
+    type_name = f"{obj_type.__module__}.{obj_type.__qualname__}"
+    if obj is None or obj_type in (bool, int, float, complex, str, bytes):
+        return (type_name, repr(obj))
+    if isinstance(obj, (list, tuple)):
+        return (type_name, tuple(_canonicalize(item) for item in obj))
+    if isinstance(obj, dict):
+        items = ((_canonicalize(k), _canonicalize(v)) for k, v in obj.items())
+        return (type_name, tuple(sorted(items, key=repr)))
+    if isinstance(obj, (set, frozenset)):
+        return (type_name, tuple(sorted(map(_canonicalize, obj), key=repr)))
+    return (type_name, repr(obj))
+
+
+def make_cache_key(*args, **kwargs) -> str:
+    """
+    Returns a hash of the arguments which is stable across processes, computed from
+     a canonical form that tags every value with its type (see `_canonicalize`)
+    """
+    data = repr(_canonicalize((args, kwargs)))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value store with optional LRU (`max_size`) and TTL (`ttl`
+     seconds) eviction, safe to share between threads and processes.
+
+    Entries are grouped by `namespace`, to which `max_size` and `clear` apply.
+    """
+
+    def __init__(
+        self,
+        path: PathInput,
+        namespace: str = "",
+        max_size: int | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local = threading.local()
+        self._size_lock = threading.Lock()
+        make_parent_dir(self.path)
+        with self._connection() as conn:
+            conn.executescript(_CACHE_SCHEMA)
+            (self._size,) = conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,)
+            ).fetchone()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> tuple[bool, Any, float]:
+        """returns (found, value, created time)"""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, created FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False, None, 0.0
+        value, created = row
+        now = time.time()
+        with conn:
+            if self.ttl is not None and now - created >= self.ttl:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return False, None, 0.0
+            conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return True, pickle.loads(value), created
+
+    def set(self, key: str, value: Any) -> None:
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (key, self.namespace, pickle.dumps(value), now, now),
+            )
+        if self.max_size is None:
+            return
+        with self._size_lock:
+            self._size += cursor.rowcount
+            if self._size <= self.max_size * (1 + _EVICTION_SLACK):
+                return
+        self.evict()
+
+    def evict(self) -> None:
+        """deletes expired entries, and the least recently used beyond `max_size`"""
+        conn = self._connection()
+        with conn:
+            if self.ttl is not None:
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND created <= ?",
+                    (self.namespace, time.time() - self.ttl),
+                )
+            if self.max_size is not None:
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                    "WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.max_size),
+                )
+            (size,) = conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        with self._size_lock:
+            self._size = size
+
+    def clear(self) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+        with self._size_lock:
+            self._size = 0
+
+
+def memoize_to_disk(
+    path: PathInput = "cache.sqlite",
+    max_size: int | None = None,
+    ttl: float | None = None,
+    front_size: int = 128,
+) -> Callable[[_F], _F]:
+    """
+    Decorator caching a function's results in a SQLite database (see `DiskCache`),
+     keyed by `make_cache_key` of its arguments, with an in-memory LRU front cache of
+     `front_size` entries. Results must be picklable.
+
+    The decorated function gets `cache` (the `DiskCache`) and `cache_clear()`.
+    """
+
+    def decorator(fn: _F) -> _F:
+        namespace = f"{fn.__module__}.{fn.__qualname__}"
+        cache = DiskCache(path, namespace, max_size, ttl)
+        front: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        front_lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_cache_key(namespace, *args, **kwargs)
+            with front_lock:
+                if key in front:
+                    value, created = front[key]
+                    if ttl is None or time.time() - created < ttl:
+                        front.move_to_end(key)
+                        return value
+                    del front[key]
+            found, value, created = cache.get(key)
+            if not found:
+                value = fn(*args, **kwargs)
+                cache.set(key, value)
+                created = time.time()
+            if front_size > 0:
+                with front_lock:
+                    front[key] = (value, created)
+                    front.move_to_end(key)
+                    if len(front) > front_size:
+                        front.popitem(last=False)
+            return value
+
+        def cache_clear() -> None:
+            with front_lock:
+                front.clear()
+            cache.clear()
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
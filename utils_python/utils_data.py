@@ -3,7 +3,8 @@ from __future__ import annotations
 import json
 import logging
 from copy import deepcopy
-from typing import Any, Iterable
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional
 
 LOGGER = logging.getLogger(__name__)
 
@@ -30,26 +31,142 @@ def is_iterable(obj, excluded_types=None):
     return isinstance(obj, Iterable) and not isinstance(obj, excluded_types)
 
 
-def stringify_keys(d: dict):
+def iter_flatten(
+    iterable: Iterable,
+    depth: Optional[int] = 1,
+    excluded_types=None,
+) -> Iterator:
     """
-    Convert a dict's keys to strings if they are not already.
+    Lazily yields the items of `iterable`, expanding nested iterables up to `depth`
+     levels deep (or fully, if `depth` is None).
+    Items for which `is_iterable(item, excluded_types)` is False (by default,
+     strings) are never expanded.
     """
-    d_copy = {}
-    for key, value in d.items():
-        # Convert non-string keys to strings
-        if not isinstance(key, str):
-            try:
-                key = str(key)
-            except Exception:
-                key = repr(key)
-
-        # Recursively process nested dictionaries
-        if isinstance(value, dict):
-            value = stringify_keys(value)
-
-        d_copy[key] = value
-
-    return d_copy
+    stack = [iter(iterable)]
+    while stack:
+        for item in stack[-1]:
+            if (depth is None or len(stack) <= depth) and is_iterable(
+                item, excluded_types
+            ):
+                stack.append(iter(item))
+                break
+            yield item
+        else:
+            stack.pop()
+
+
+def _stringify_key(key) -> str:
+    if isinstance(key, str):
+        return key
+    try:
+        return str(key)
+    except Exception:
+        return repr(key)
+
+
+_CONTAINER_TYPES = (dict, list, tuple)
+
+
+def _has_containers(items: Iterable) -> bool:
+    # collecting the distinct types first is much faster than isinstance per item
+    return any(issubclass(t, _CONTAINER_TYPES) for t in set(map(type, items)))
+
+
+def _stringify_flat(obj: dict | list | tuple) -> dict | list | tuple | None:
+    """
+    Returns `obj` with its keys stringified if it holds no containers, or None if it
+     has to be walked item by item
+    """
+    if isinstance(obj, dict):
+        if _has_containers(obj.values()):
+            return None
+        try:
+            # a cheap C-level check that every key is a string
+            "".join(obj)
+        except TypeError:
+            return {_stringify_key(key): value for key, value in obj.items()}
+        return obj
+    if _has_containers(obj):
+        return None
+    return obj
+
+
+class _StringifyFrame:
+    __slots__ = ("obj", "is_dict", "items", "index", "new_items", "pending_key")
+
+    def __init__(self, obj: dict | list | tuple):
+        self.obj = obj
+        self.is_dict = isinstance(obj, dict)
+        self.items = iter(obj.items()) if self.is_dict else iter(obj)
+        self.index = 0
+        # only allocated once an item changes, copying the unchanged items before it
+        self.new_items: list | None = None
+        self.pending_key = None
+
+    def add(self, key, value, original_value) -> None:
+        if self.is_dict:
+            new_key = key if isinstance(key, str) else _stringify_key(key)
+            if self.new_items is None:
+                if new_key is key and value is original_value:
+                    self.index += 1
+                    return
+                self.new_items = list(islice(self.obj.items(), self.index))
+            self.new_items.append((new_key, value))
+        else:
+            if self.new_items is None:
+                if value is original_value:
+                    self.index += 1
+                    return
+                self.new_items = list(islice(self.obj, self.index))
+            self.new_items.append(value)
+
+    def result(self) -> dict | list | tuple:
+        if self.new_items is None:
+            return self.obj
+        if self.is_dict:
+            return dict(self.new_items)
+        if isinstance(self.obj, list):
+            return self.new_items
+        if hasattr(self.obj, "_fields"):
+            return type(self.obj)(*self.new_items)
+        return tuple(self.new_items)
+
+
+def stringify_keys(data: Any) -> Any:
+    """
+    Convert the keys of any dicts in `data` (including those nested in dicts, lists
+     and tuples) to strings.
+    Containers which need no changes are returned as-is rather than copied, and
+     nesting depth is not limited by the recursion limit.
+    """
+    if not isinstance(data, _CONTAINER_TYPES):
+        return data
+    if (result := _stringify_flat(data)) is not None:
+        return result
+    stack = [_StringifyFrame(data)]
+    active_ids = {id(data)}
+    while True:
+        frame = stack[-1]
+        for item in frame.items:
+            key, value = item if frame.is_dict else (None, item)
+            if isinstance(value, _CONTAINER_TYPES):
+                if (result := _stringify_flat(value)) is None:
+                    if id(value) in active_ids:
+                        raise ValueError("Circular reference detected")
+                    frame.pending_key = key
+                    stack.append(_StringifyFrame(value))
+                    active_ids.add(id(value))
+                    break
+                frame.add(key, result, value)
+            else:
+                frame.add(key, value, value)
+        else:
+            stack.pop()
+            active_ids.discard(id(frame.obj))
+            result = frame.result()
+            if not stack:
+                return result
+            stack[-1].add(stack[-1].pending_key, result, frame.obj)
 
 
 def serialize_data(data: Any, indent=4, default=str):
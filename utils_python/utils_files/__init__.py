@@ -1,2 +1,57 @@
-from .base import *
-from .extra import *
+from typing import TYPE_CHECKING
+
+from utils_python._lazy import lazy_attach
+
+if TYPE_CHECKING:
+    from .base import *
+    from .dedup import *
+    from .extra import *
+    from .mirror import *
+    from .watch import *
+
+__getattr__, __dir__, __all__ = lazy_attach(
+    __name__,
+    [
+        "base",
+        "dedup",
+        "extra",
+        "mirror",
+        "watch",
+    ],
+    {
+        "make_parent_dir": "base",
+        "get_rotated_path": "base",
+        "rotate_file": "base",
+        "dump_data": "extra",
+        "run_on_paths": "extra",
+        "run_on_path_flat": "extra",
+        "count_paths": "extra",
+        "run_on_path": "extra",
+        "read_list_from_file": "extra",
+        "read_dict_from_file": "extra",
+        "write_at_exit": "extra",
+        "download": "extra",
+        "unzip": "extra",
+        "STORE_EXTENSIONS": "extra",
+        "zip_dir": "extra",
+        "cd": "extra",
+        "preserve_filedate": "extra",
+        "copy_filedate": "extra",
+        "update_filedate_created": "extra",
+        "update_filedate_modified": "extra",
+        "update_filedate_accessed": "extra",
+        "FileTimes": "extra",
+        "get_filedates": "extra",
+        "set_filedates": "extra",
+        "preserve_filedates": "extra",
+        "sanitize_filename_windows_style": "extra",
+        "create_windows_url_shortcut": "extra",
+        "EDGE_SIZE": "dedup",
+        "find_duplicate_files": "dedup",
+        "hardlink_duplicate_files": "dedup",
+        "MirrorStats": "mirror",
+        "mirror_tree": "mirror",
+        "iter_path_changes": "watch",
+        "watch_path": "watch",
+    },
+)
@@ -5,3 +5,60 @@ from utils_python.utils_typing import PathInput
 
 def make_parent_dir(filepath: PathInput):
     Path(filepath).parent.mkdir(exist_ok=True, parents=True)
+
+
+def get_rotated_path(
+    filepath: PathInput,
+    index: int,
+    add_extension: str | None = None,
+) -> Path:
+    """
+    Returns the path `rotate_file` uses for the `index`th rotation of `filepath`,
+     e.g. `app.log` -> `app.2.log` (or `app.2.log.gz` with `add_extension=".gz"`)
+    """
+    orig_path = Path(filepath)
+    dest_stem = orig_path.stem + f".{index}"
+    dest_suffix = orig_path.suffix
+    if add_extension is not None:
+        if not add_extension.startswith("."):
+            add_extension = f".{add_extension}"
+        dest_suffix += add_extension
+    return orig_path.with_stem(dest_stem).with_suffix(dest_suffix)
+
+
+def rotate_file(
+    filepath: PathInput,
+    maximum_rotations: int | None = None,
+    add_extension: str | None = None,
+    source_path: PathInput | None = None,
+):
+    """
+    Shifts `filepath`'s existing rotations up by one and moves `filepath`
+     (or `source_path`, if given) into the first rotation slot
+    """
+    orig_path = Path(filepath)
+    src_path = orig_path if source_path is None else Path(source_path)
+    if not src_path.is_file():
+        raise FileNotFoundError(src_path)
+    deletes: set[Path] = set()
+    renames: dict[Path, Path] = {}
+    i = 1
+    while True:
+        dest_path = get_rotated_path(orig_path, i, add_extension)
+        renames[src_path] = dest_path
+        if (
+            maximum_rotations is not None
+            and i >= maximum_rotations
+            and dest_path.is_file()
+        ):
+            deletes.add(dest_path)
+        if not dest_path.is_file():
+            break
+        src_path = dest_path
+        i += 1
+    for path in deletes:
+        path.unlink()
+        if path in renames:
+            del renames[path]
+    for src_path, dest_path in reversed(renames.items()):
+        src_path.rename(dest_path)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Hashable, Iterable, Optional, TypeVar
+
+from tqdm import tqdm
+
+from utils_python.utils_files.extra import FileTimes, set_filedates
+from utils_python.utils_typing import PathInput
+
+LOGGER = logging.getLogger(__name__)
+
+EDGE_SIZE = 4096
+
+_K = TypeVar("_K", bound=Hashable)
+
+
+def _iter_files(paths: Iterable[PathInput], min_size: int):
+    """
+    Yields `(path, stat)` for every regular file under `paths` of at least `min_size`
+     bytes, skipping further paths to an inode that was already seen (i.e. existing
+     hardlinks)
+    """
+    seen_inodes: set[tuple[int, int]] = set()
+    stack = [os.fspath(path) for path in paths]
+    while stack:
+        path = stack.pop()
+        if not os.path.isdir(path):
+            entries = [path]
+        else:
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError as exc:
+                LOGGER.warning("Skipping %r: %s", path, exc)
+                continue
+        for entry in entries:
+            entry_path = os.fspath(entry)
+            try:
+                if isinstance(entry, os.DirEntry) and entry.is_dir(
+                    follow_symlinks=False
+                ):
+                    stack.append(entry_path)
+                    continue
+                if os.path.islink(entry_path):
+                    continue
+                stat = (
+                    entry.stat() if isinstance(entry, os.DirEntry) else os.stat(entry)
+                )
+            except OSError as exc:
+                LOGGER.warning("Skipping %r: %s", entry_path, exc)
+                continue
+            if not os.path.isfile(entry_path) or stat.st_size < min_size:
+                continue
+            inode = (stat.st_dev, stat.st_ino)
+            if inode in seen_inodes:
+                continue
+            seen_inodes.add(inode)
+            yield entry_path, stat
+
+
+def _hash_edges(path: str, size: int, edge_size: int) -> bytes:
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * edge_size:
+            hasher.update(f.read())
+        else:
+            hasher.update(f.read(edge_size))
+            f.seek(-edge_size, os.SEEK_END)
+            hasher.update(f.read(edge_size))
+    return hasher.digest()
+
+
+def _hash_full(path: str) -> bytes:
+    hasher = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        hasher.update(m)
+    return hasher.digest()
+
+
+def _regroup(
+    groups: list[tuple[int, list[str]]],
+    key_func: Callable[[str, int], _K],
+    executor: ThreadPoolExecutor,
+    pbar: tqdm,
+    progress_bytes=False,
+) -> list[tuple[int, list[str]]]:
+    """
+    Splits each `(size, paths)` group by `key_func` (run on the thread pool),
+     dropping any resulting singletons
+    """
+
+    def get_key(path: str, size: int) -> Optional[_K]:
+        try:
+            return key_func(path, size)
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("Skipping %r: %s", path, exc)
+            return None
+        finally:
+            pbar.update(size if progress_bytes else 1)
+
+    keys = executor.map(
+        get_key,
+        *zip(*((path, size) for size, group in groups for path in group)),
+    )
+    new_groups: list[tuple[int, list[str]]] = []
+    for size, group in groups:
+        by_key: defaultdict[_K, list[str]] = defaultdict(list)
+        for path in group:
+            key = next(keys)
+            if key is not None:
+                by_key[key].append(path)
+        new_groups.extend((size, g) for g in by_key.values() if len(g) > 1)
+    return new_groups
+
+
+def find_duplicate_files(
+    paths: PathInput | Iterable[PathInput],
+    min_size: int = 1,
+    edge_size: int = EDGE_SIZE,
+    workers: Optional[int] = None,
+    progress=True,
+) -> list[list[Path]]:
+    """
+    Finds groups of files with identical contents under `paths`.
+
+    Files are grouped by size, then by a hash of their first and last `edge_size`
+     bytes, and only the files still sharing a group are fully hashed (via mmap, on a
+     thread pool), so most files are never fully read.
+    Paths which are already hardlinks to the same inode are only reported once.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    min_size = max(min_size, 1)
+
+    by_size: defaultdict[int, list[str]] = defaultdict(list)
+    for path, stat in _iter_files(paths, min_size):
+        by_size[stat.st_size].append(path)
+    groups = [(size, group) for size, group in by_size.items() if len(group) > 1]
+    LOGGER.debug(
+        "%d files in %d groups share a size with another file",
+        sum(len(g) for _, g in groups),
+        len(groups),
+    )
+    if not groups:
+        return []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        with tqdm(
+            total=sum(len(g) for _, g in groups),
+            desc="Hashing file edges",
+            unit="file",
+            disable=not progress,
+        ) as pbar:
+            groups = _regroup(
+                groups,
+                lambda path, size: _hash_edges(path, size, edge_size),
+                executor,
+                pbar,
+            )
+
+        # files no larger than two edges were read whole, so their edge hash is a
+        #  full hash
+        done_groups = [(size, g) for size, g in groups if size <= 2 * edge_size]
+        large_groups = [(size, g) for size, g in groups if size > 2 * edge_size]
+        if large_groups:
+            with tqdm(
+                total=sum(size * len(g) for size, g in large_groups),
+                desc="Hashing candidate files",
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
+                disable=not progress,
+            ) as pbar:
+                done_groups += _regroup(
+                    large_groups,
+                    lambda path, size: _hash_full(path),
+                    executor,
+                    pbar,
+                    progress_bytes=True,
+                )
+
+    return sorted(sorted(Path(path) for path in group) for _, group in done_groups)
+
+
+def hardlink_duplicate_files(
+    duplicate_groups: Iterable[Iterable[PathInput]],
+    dry_run=False,
+) -> int:
+    """
+    Replaces every file in each group with a hardlink to the first file in that group
+     on the same device, returning the number of bytes freed.
+    Files on other devices (which can't be hardlinked to) are linked among themselves.
+    The kept file takes the earliest modified and earliest created times of the files
+     linked to it, and the parent directories of replaced files keep their timestamps.
+    """
+    freed = 0
+    keep_times: list[tuple[Path, FileTimes]] = []
+    try:
+        for group in duplicate_groups:
+            by_device: defaultdict[int, list[tuple[Path, os.stat_result]]] = (
+                defaultdict(list)
+            )
+            for path in map(Path, group):
+                stat_result = path.stat()
+                by_device[stat_result.st_dev].append((path, stat_result))
+            for device_group in by_device.values():
+                if len(device_group) < 2:
+                    continue
+                if len(by_device) > 1:
+                    LOGGER.info(
+                        "Linking %d of %d duplicates of %r on device %d",
+                        len(device_group),
+                        sum(map(len, by_device.values())),
+                        str(device_group[0][0]),
+                        device_group[0][1].st_dev,
+                    )
+                freed += _hardlink_device_group(device_group, dry_run)
+                keep_times.append(
+                    (device_group[0][0], _get_earliest_times(device_group))
+                )
+    finally:
+        if not dry_run:
+            # the kept inode is shared by all its links, so this covers them all
+            set_filedates(keep_times)
+    return freed
+
+
+def _get_earliest_times(device_group: list[tuple[Path, os.stat_result]]) -> FileTimes:
+    times = [FileTimes.from_stat(stat_result) for _, stat_result in device_group]
+    created_times = [t.created_ns for t in times if t.created_ns is not None]
+    return FileTimes(
+        modified_ns=min(t.modified_ns for t in times),
+        created_ns=min(created_times) if created_times else None,
+    )
+
+
+def _hardlink_device_group(
+    device_group: list[tuple[Path, os.stat_result]],
+    dry_run: bool,
+) -> int:
+    (keep, _), *duplicates = device_group
+    freed = 0
+    for duplicate, duplicate_stat in duplicates:
+        LOGGER.info("Linking %r -> %r", str(duplicate), str(keep))
+        freed += duplicate_stat.st_size
+        if dry_run:
+            continue
+        parent_stat = duplicate.parent.stat()
+        tmp_path = duplicate.with_name(f".{duplicate.name}.dedup-tmp")
+        os.link(keep, tmp_path)
+        try:
+            os.replace(tmp_path, duplicate)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.utime(
+            duplicate.parent, ns=(parent_stat.st_atime_ns, parent_stat.st_mtime_ns)
+        )
+    return freed
@@ -4,22 +4,37 @@ import json
 import logging
 import os
 import shutil
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime
+from fnmatch import fnmatch
 from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Generator, Optional
-from zipfile import ZipFile
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
 
 import requests
 from filedate import File as FileDateObj
 from tqdm import tqdm
 
 from utils_python.utils_data import deduplicate, serialize_data
-from utils_python.utils_files.base import make_parent_dir
+from utils_python.utils_files.base import make_parent_dir, rotate_file
 from utils_python.utils_main import identity
 from utils_python.utils_strings import truncate_str
-from utils_python.utils_tqdm import print_tqdm
+from utils_python.utils_tqdm import print_tqdm, tqdm_map
 from utils_python.utils_typing import PathInput
 
 LOGGER = logging.getLogger(__name__)
@@ -42,45 +57,6 @@ def dump_data(
         f.write(data_serialized)
 
 
-def rotate_file(
-    filepath: PathInput,
-    maximum_rotations: int | None = None,
-    add_extension: str | None = None,
-):
-    orig_path = Path(filepath)
-    if not orig_path.is_file():
-        raise FileNotFoundError(orig_path)
-    deletes: set[Path] = set()
-    renames: dict[Path, Path] = {}
-    i = 1
-    src_path = orig_path
-    while True:
-        dest_stem = orig_path.stem + f".{i}"
-        dest_suffix = orig_path.suffix
-        if add_extension is not None:
-            if not add_extension.startswith("."):
-                add_extension = f".{add_extension}"
-            dest_suffix += add_extension
-        dest_path = orig_path.with_stem(dest_stem).with_suffix(dest_suffix)
-        renames[src_path] = dest_path
-        if (
-            maximum_rotations is not None
-            and i >= maximum_rotations
-            and dest_path.is_file()
-        ):
-            deletes.add(dest_path)
-        if not dest_path.is_file():
-            break
-        src_path = dest_path
-        i += 1
-    for path in deletes:
-        path.unlink()
-        if path in renames:
-            del renames[path]
-    for src_path, dest_path in reversed(renames.items()):
-        src_path.rename(dest_path)
-
-
 def run_on_paths(
     paths: list[Path],
     file_callback: Optional[Callable[[Path], Any]] = None,
@@ -99,6 +75,7 @@ def run_on_path_flat(
     path: Path,
     file_callback: Optional[Callable[[Path], Any]] = None,
     dir_callback: Optional[Callable[[Path], Any]] = None,
+    progress=True,
 ):
     path = Path(path)
     all_results = {}
@@ -106,7 +83,7 @@ def run_on_path_flat(
         paths = [path]
     else:
         paths = list(path.rglob("*"))
-    for p in tqdm(paths):
+    for p in tqdm(paths, disable=not progress):
         if p.is_file():
             path_info = {"is_dir": False}
             if file_callback is not None:
@@ -129,49 +106,130 @@ def run_on_path_flat(
     return all_results
 
 
+def count_paths(path: PathInput, follow_symlinks=False) -> int:
+    """
+    Counts `path` and everything under it (only descending into symlinks to
+     directories if `follow_symlinks`), using `os.scandir` to avoid constructing a
+     `Path` per entry
+    """
+    if not os.path.isdir(path):
+        return 1
+    count = 1
+    stack = [os.fspath(path)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                count += 1
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    stack.append(entry.path)
+    return count
+
+
 def run_on_path(
     path: Path,
     file_callback: Optional[Callable[[Path], Any]] = None,
     dir_callback: Optional[Callable[[Path], Any]] = None,
     depth=0,
+    single_bar=False,
+    count_total=False,
+    description_interval: float = 0.5,
+    mininterval: float = 0.5,
+    miniters: Optional[int] = None,
 ):
+    """
+    Runs `file_callback`/`dir_callback` on `path` and (recursively) its contents.
+
+    By default, a progress bar is shown for each directory. With `single_bar=True`,
+     one bar counts every path visited instead, and its description is updated at
+     most every `description_interval` seconds; `count_total=True` first counts the
+     paths (with `count_paths`, following directory symlinks as the walk does) so
+     that the bar has a total.
+    `mininterval` and `miniters` are passed to the single bar; with `miniters=None`,
+     tqdm adapts it to the update rate so the clock is checked about once per
+     `mininterval`.
+    """
+    if single_bar:
+        total = count_paths(path, follow_symlinks=True) if count_total else None
+        with tqdm(
+            total=total,
+            unit="path",
+            mininterval=mininterval,
+            miniters=miniters,
+            leave=depth == 0,
+        ) as pbar:
+            return _run_on_path_single_bar(
+                Path(path), file_callback, dir_callback, pbar, description_interval
+            )
+
     if not isinstance(path, Path):
         path = Path(path)
-    path_results: dict[str, Any]
-    if path.is_file():
-        path_results = {"is_dir": False}
-        if file_callback is not None:
-            try:
-                path_result = file_callback(path)
-            except Exception as exc:
-                print_tqdm(f"ERROR running callback on file {path!r}")
-                raise exc
-            path_results["result"] = path_result
+    path_results = _run_path_callback(path, file_callback, dir_callback)
+    if not path_results["is_dir"]:
         return {path: path_results}
-    if path.is_dir():
-        path_results = {"is_dir": True}
-        if dir_callback is not None:
-            try:
-                dir_result = dir_callback(path)
-            except Exception as exc:
-                print_tqdm(f"ERROR running callback on dir {path!r}")
-                raise exc
-            path_results["result"] = dir_result
-        subpath_results: dict[Path, dict[str, Any]] = {}
-        subpaths = list(path.iterdir())
-        with tqdm(subpaths, leave=depth == 0) as pbar:
-            for i, subpath in enumerate(pbar):
-                pbar.set_description(str(subpath))
-                subpath_dict = run_on_path(
-                    subpath, file_callback, dir_callback, depth + 1
-                )
-                subpath_results.update(subpath_dict)
-                if i == len(subpaths) - 1:
-                    pbar.set_description(repr(path))
-            pbar.set_description(repr(path))
-        path_results["contents"] = subpath_results
+    subpath_results: dict[Path, dict[str, Any]] = {}
+    subpaths = list(path.iterdir())
+    with tqdm(subpaths, leave=depth == 0) as pbar:
+        for i, subpath in enumerate(pbar):
+            pbar.set_description(str(subpath))
+            subpath_dict = run_on_path(subpath, file_callback, dir_callback, depth + 1)
+            subpath_results.update(subpath_dict)
+            if i == len(subpaths) - 1:
+                pbar.set_description(repr(path))
+        pbar.set_description(repr(path))
+    path_results["contents"] = subpath_results
+    return {path: path_results}
+
+
+def _run_path_callback(
+    path: Path,
+    file_callback: Optional[Callable[[Path], Any]],
+    dir_callback: Optional[Callable[[Path], Any]],
+) -> dict[str, Any]:
+    """
+    Runs `file_callback` or `dir_callback` on `path`, returning its `is_dir` flag and
+     the callback's `result` (shared by both `run_on_path` modes)
+    """
+    if path.is_file():
+        is_dir, callback, kind = False, file_callback, "file"
+    elif path.is_dir():
+        is_dir, callback, kind = True, dir_callback, "dir"
+    else:
+        raise TypeError(f"{path=!r} was not a file or a dir")
+    path_results: dict[str, Any] = {"is_dir": is_dir}
+    if callback is not None:
+        try:
+            path_results["result"] = callback(path)
+        except Exception as exc:
+            print_tqdm(f"ERROR running callback on {kind} {path!r}")
+            raise exc
+    return path_results
+
+
+def _run_on_path_single_bar(
+    path: Path,
+    file_callback: Optional[Callable[[Path], Any]],
+    dir_callback: Optional[Callable[[Path], Any]],
+    pbar: tqdm,
+    description_interval: float,
+):
+    last_description_time = 0.0
+
+    def _run(path: Path) -> dict[Path, dict[str, Any]]:
+        nonlocal last_description_time
+        now = time.monotonic()
+        if now - last_description_time >= description_interval:
+            pbar.set_description_str(str(path), refresh=False)
+            last_description_time = now
+        path_results = _run_path_callback(path, file_callback, dir_callback)
+        pbar.update()
+        if path_results["is_dir"]:
+            subpath_results: dict[Path, dict[str, Any]] = {}
+            for subpath in path.iterdir():
+                subpath_results.update(_run(subpath))
+            path_results["contents"] = subpath_results
         return {path: path_results}
-    raise TypeError(f"{path=!r} was not a file or a dir")
+
+    return _run(path)
 
 
 def read_list_from_file(
@@ -322,16 +380,272 @@ def download(url, filepath, verbose=True):
     return path
 
 
+def _get_member_target(member: ZipInfo, extract_dir: Path) -> Path:
+    # sanitizes the member name the same way ZipFile.extract does
+    arcname = member.filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [
+        p
+        for p in arcname.split(os.path.sep)
+        if p not in ("", os.path.curdir, os.path.pardir)
+    ]
+    return extract_dir.joinpath(*parts)
+
+
+def _get_member_mtime(member: ZipInfo) -> float:
+    return time.mktime((*member.date_time, 0, 0, -1))
+
+
+def _is_member_unchanged(member: ZipInfo, target: Path) -> bool:
+    """
+    Checks size first, then modified time (to the zip format's 2s resolution),
+     and only reads the file to compare its CRC if the modified times differ
+    """
+    try:
+        stat_result = target.stat()
+    except FileNotFoundError:
+        return False
+    if stat_result.st_size != member.file_size:
+        return False
+    if abs(stat_result.st_mtime - _get_member_mtime(member)) <= 2:
+        return True
+    crc = 0
+    with open(target, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            crc = zlib.crc32(chunk, crc)
+    return crc == member.CRC
+
+
 def unzip(
     zipped_file: PathInput,
     class_=ZipFile,
     extract_dir: PathInput | None = None,
+    patterns: str | Iterable[str] | None = None,
+    skip_unchanged=False,
+    workers: Optional[int] = None,
+    progress=False,
 ):
-    if extract_dir is not None:
-        extract_dir = Path(extract_dir)
+    """
+    Extracts `zipped_file` into `extract_dir` (default: the current directory).
+
+    If `patterns` are given, only members whose names match any of them (via
+     `fnmatch`) are extracted.
+    If `skip_unchanged`, members whose size and modified time or CRC already match
+     the file on disk are left alone, and extracted files get the member's modified
+     time so later runs can skip them.
+    If `workers` is given, members are decompressed on that many threads, each with
+     its own handle.
+    """
+    if patterns is None and not skip_unchanged and workers is None and not progress:
+        with class_(Path(zipped_file), "r") as zip_ref:
+            zip_ref.extractall(None if extract_dir is None else Path(extract_dir))
+        return
 
+    extract_dir = Path.cwd() if extract_dir is None else Path(extract_dir)
+    if isinstance(patterns, str):
+        patterns = [patterns]
     with class_(Path(zipped_file), "r") as zip_ref:
-        zip_ref.extractall(extract_dir)
+        members = zip_ref.infolist()
+    if patterns is not None:
+        members = [
+            member
+            for member in members
+            if any(fnmatch(member.filename, pattern) for pattern in patterns)
+        ]
+    for member in members:
+        if member.is_dir():
+            _get_member_target(member, extract_dir).mkdir(parents=True, exist_ok=True)
+    members = [member for member in members if not member.is_dir()]
+    if skip_unchanged:
+        n_members = len(members)
+        members = [
+            member
+            for member in members
+            if not _is_member_unchanged(member, _get_member_target(member, extract_dir))
+        ]
+        LOGGER.debug("Skipping %d unchanged members", n_members - len(members))
+    # before Python 3.13, ZipFile.extract creates missing parent dirs without
+    #  `exist_ok`, so threads extracting into the same new dir would race
+    for parent in {_get_member_target(m, extract_dir).parent for m in members}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    handles = threading.local()
+    open_handles: list[ZipFile] = []
+    open_handles_lock = threading.Lock()
+
+    def extract_member(member: ZipInfo, pbar: tqdm) -> None:
+        if (zip_ref := getattr(handles, "zip_ref", None)) is None:
+            zip_ref = handles.zip_ref = class_(Path(zipped_file), "r")
+            with open_handles_lock:
+                open_handles.append(zip_ref)
+        zip_ref.extract(member, extract_dir)
+        if skip_unchanged:
+            mtime = _get_member_mtime(member)
+            os.utime(_get_member_target(member, extract_dir), (mtime, mtime))
+        pbar.update(member.file_size)
+
+    try:
+        with (
+            tqdm(
+                total=sum(member.file_size for member in members),
+                desc=f"Extracting {Path(zipped_file).name}",
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
+                disable=not progress,
+            ) as pbar,
+            ThreadPoolExecutor(max_workers=workers or 1) as executor,
+        ):
+            for _ in executor.map(partial(extract_member, pbar=pbar), members):
+                pass
+    finally:
+        for zip_ref in open_handles:
+            zip_ref.close()
+
+
+STORE_EXTENSIONS = frozenset(
+    {
+        ".mp3",
+        ".mp4",
+        ".m4a",
+        ".m4v",
+        ".aac",
+        ".ogg",
+        ".opus",
+        ".flac",
+        ".mkv",
+        ".webm",
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".gif",
+        ".webp",
+        ".zip",
+        ".gz",
+        ".bz2",
+        ".xz",
+        ".7z",
+    }
+)
+
+
+def _compress_member(path: str, compresslevel: int) -> tuple[int, int, bytes]:
+    """
+    Returns `(crc, file_size, raw_deflate_data)` for the file at `path`
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+    crc = file_size = 0
+    chunks = []
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+            chunks.append(compressor.compress(chunk))
+    chunks.append(compressor.flush())
+    return crc, file_size, b"".join(chunks)
+
+
+def _write_compressed_member(
+    zip_ref: ZipFile,
+    zinfo: ZipInfo,
+    crc: int,
+    file_size: int,
+    data: bytes,
+) -> None:
+    # ZipFile has no public API for writing already-compressed data, so this mirrors
+    #  what ZipFile.open(..., "w") does on open and close (tests/test_zip_dir.py pins
+    #  it, including ZIP64 members)
+    if not zip_ref.fp:
+        raise ValueError("Attempt to write to ZIP archive that was already closed")
+    if zip_ref._writing:
+        raise ValueError(
+            "Can't write to ZIP archive while an open writing handle exists"
+        )
+    zinfo.compress_type = ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = len(data)
+    zinfo.flag_bits = 0
+    zip64 = max(file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+    with zip_ref._lock:
+        zip_ref._writecheck(zinfo)
+        zip_ref._didModify = True
+        if zip_ref._seekable:
+            zip_ref.fp.seek(zip_ref.start_dir)
+        zinfo.header_offset = zip_ref.fp.tell()
+        zip_ref.fp.write(zinfo.FileHeader(zip64))
+        zip_ref.fp.write(data)
+        zip_ref.filelist.append(zinfo)
+        zip_ref.NameToInfo[zinfo.filename] = zinfo
+        zip_ref.start_dir = zip_ref.fp.tell()
+
+
+def zip_dir(
+    src_dir: PathInput,
+    zipped_file: PathInput,
+    workers: Optional[int] = None,
+    compresslevel: int = 6,
+    store_extensions: Iterable[str] = STORE_EXTENSIONS,
+    progress=True,
+) -> Path:
+    """
+    Writes everything under `src_dir` to the zip archive `zipped_file`, with member
+     names relative to `src_dir`.
+
+    Members are deflated into memory in a process pool (see `tqdm_map`) and written
+     in order with their precomputed CRCs; files with an extension in
+     `store_extensions` (already-compressed media) are streamed in uncompressed
+     instead.
+    """
+    src_dir = Path(src_dir)
+    zipped_file = Path(zipped_file)
+    make_parent_dir(zipped_file)
+    store_extensions = {extension.lower() for extension in store_extensions}
+
+    paths = sorted(run_on_path_flat(src_dir, progress=progress))
+    zipped_file_abs = zipped_file.absolute()
+    files = {p for p in paths if p.is_file() and p.absolute() != zipped_file_abs}
+    compress_files = [
+        p for p in paths if p in files and p.suffix.lower() not in store_extensions
+    ]
+
+    def iter_compressed() -> Iterator[tuple[int, int, bytes]]:
+        return tqdm_map(
+            partial(_compress_member, compresslevel=compresslevel),
+            (os.fspath(p) for p in compress_files),
+            workers=workers,
+            kind="process",
+            total=len(compress_files),
+            disable=True,
+        )
+
+    with (
+        ZipFile(zipped_file, "w", strict_timestamps=False) as zip_ref,
+        tqdm(
+            total=sum(p.stat().st_size for p in files),
+            desc=f"Zipping {src_dir}",
+            unit="B",
+            unit_scale=True,
+            unit_divisor=1024,
+            disable=not progress,
+        ) as pbar,
+    ):
+        compressed = iter_compressed() if compress_files else iter(())
+        for path in paths:
+            arcname = path.relative_to(src_dir).as_posix()
+            if path.is_dir():
+                zip_ref.write(path, arcname)
+            elif path in files and path.suffix.lower() in store_extensions:
+                zip_ref.write(path, arcname, compress_type=ZIP_STORED)
+                pbar.update(path.stat().st_size)
+            elif path in files:
+                crc, file_size, data = next(compressed)
+                zinfo = ZipInfo.from_file(path, arcname, strict_timestamps=False)
+                _write_compressed_member(zip_ref, zinfo, crc, file_size, data)
+                pbar.update(file_size)
+    return zipped_file
 
 
 @contextmanager
@@ -416,6 +730,135 @@ def update_filedate_accessed(
     file_date.accessed = new_time
 
 
+class FileTimes(NamedTuple):
+    """
+    File timestamps in integer nanoseconds since the epoch; `None` means "leave
+     unchanged".
+    `created_ns` is read from `st_birthtime_ns` where the platform reports it, and
+     only applied on Windows
+    """
+
+    modified_ns: Optional[int] = None
+    accessed_ns: Optional[int] = None
+    created_ns: Optional[int] = None
+
+    @classmethod
+    def from_stat(cls, stat_result: os.stat_result) -> FileTimes:
+        return cls(
+            modified_ns=stat_result.st_mtime_ns,
+            accessed_ns=stat_result.st_atime_ns,
+            created_ns=getattr(stat_result, "st_birthtime_ns", None),
+        )
+
+
+def _iter_path_items(
+    items: Mapping[PathInput, FileTimes] | Iterable[tuple[PathInput, FileTimes]],
+) -> Iterable[tuple[PathInput, FileTimes]]:
+    return items.items() if isinstance(items, Mapping) else items
+
+
+def _set_filetimes(path: PathInput, times: FileTimes) -> None:
+    if times.created_ns is not None and os.name == "nt":
+        # filedate only sets whole seconds, so this goes first and os.utime restores
+        #  the rest
+        FileDateObj(os.fspath(path)).created = times.created_ns / 1e9
+    if times.modified_ns is None and times.accessed_ns is None:
+        return
+    if times.modified_ns is None or times.accessed_ns is None:
+        current = os.stat(path)
+        times = times._replace(
+            modified_ns=(
+                current.st_mtime_ns if times.modified_ns is None else times.modified_ns
+            ),
+            accessed_ns=(
+                current.st_atime_ns if times.accessed_ns is None else times.accessed_ns
+            ),
+        )
+    os.utime(path, ns=(times.accessed_ns, times.modified_ns))
+
+
+def get_filedates(
+    paths: Iterable[PathInput],
+    workers: Optional[int] = None,
+) -> dict[Path, FileTimes]:
+    """
+    Reads the timestamps of many files with one `os.stat` each, on a thread pool
+    """
+    paths = [Path(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        stat_results = executor.map(os.stat, paths)
+        return {
+            path: FileTimes.from_stat(stat_result)
+            for path, stat_result in zip(paths, stat_results)
+        }
+
+
+def set_filedates(
+    items: Mapping[PathInput, FileTimes] | Iterable[tuple[PathInput, FileTimes]],
+    workers: Optional[int] = None,
+) -> None:
+    """
+    Applies timestamps to many files on a thread pool.
+    Modified/accessed times are set with `os.utime` at nanosecond precision;
+     `filedate` is only used for creation times on Windows
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(
+            lambda item: _set_filetimes(*item), _iter_path_items(items)
+        ):
+            pass
+
+
+def _snapshot_filedates(paths: Iterable[PathInput]) -> dict[str, FileTimes]:
+    times: dict[str, FileTimes] = {}
+    stack: list[str] = []
+    for path in paths:
+        path = os.fspath(path)
+        times[path] = FileTimes.from_stat(os.stat(path))
+        if os.path.isdir(path):
+            stack.append(path)
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                times[entry.path] = FileTimes.from_stat(
+                    entry.stat(follow_symlinks=False)
+                )
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return times
+
+
+@contextmanager
+def preserve_filedates(
+    paths: PathInput | Iterable[PathInput],
+    created=True,
+    modified=True,
+    accessed=False,
+    workers: Optional[int] = None,
+) -> Generator[None, None, None]:
+    """
+    Like `preserve_filedate`, but for many files at once: `paths` and everything
+     under any directories among them are snapshotted in one `scandir` pass, and on
+     exit the timestamps of those which still exist are restored (see
+     `set_filedates`)
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    original_times = _snapshot_filedates(paths)
+    yield
+    # symlinks are skipped, since os.utime would follow them
+    restore_times = {
+        path: FileTimes(
+            modified_ns=times.modified_ns if modified else None,
+            accessed_ns=times.accessed_ns if accessed else None,
+            created_ns=times.created_ns if created else None,
+        )
+        for path, times in original_times.items()
+        if os.path.exists(path) and not os.path.islink(path)
+    }
+    set_filedates(restore_times, workers=workers)
+
+
 def sanitize_filename_windows_style(name: str) -> str:
     # sanitizes filenames like Windows 10's "Create Shortcut" does
     s = ""
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from tqdm import tqdm
+
+from utils_python.utils_typing import PathInput
+
+LOGGER = logging.getLogger(__name__)
+
+_COPY_CHUNK_SIZE = 64 * 1024 * 1024
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+
+
+class MirrorStats(NamedTuple):
+    copied: int
+    skipped: int
+    deleted: int
+    bytes_copied: int
+
+
+def _scan_tree(root: str) -> dict[str, os.stat_result]:
+    """
+    Maps every path under `root` (relative to it) to its `lstat` result, using one
+     `scandir` pass
+    """
+    entries: dict[str, os.stat_result] = {}
+    if not os.path.isdir(root):
+        return entries
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as it:
+            for entry in it:
+                rel_path = os.path.join(rel_dir, entry.name)
+                entries[rel_path] = entry.stat(follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+    return entries
+
+
+def _copy_file_contents(src: str, dst: str, size: int) -> None:
+    """
+    Copies `src` to `dst` in-kernel where possible,
+     trying `os.copy_file_range`, then `os.sendfile`, then a userspace copy
+    """
+    with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+        fd_src, fd_dst = f_src.fileno(), f_dst.fileno()
+        offset = 0
+        for copy_func in (
+            getattr(os, "copy_file_range", None),
+            getattr(os, "sendfile", None),
+        ):
+            if copy_func is None:
+                continue
+            try:
+                while offset < size:
+                    if copy_func is os.sendfile:
+                        n = os.sendfile(fd_dst, fd_src, offset, _COPY_CHUNK_SIZE)
+                    else:
+                        n = copy_func(fd_src, fd_dst, _COPY_CHUNK_SIZE, offset, offset)
+                    if n == 0:
+                        break
+                    offset += n
+                return
+            except OSError as exc:
+                if exc.errno not in _FALLBACK_ERRNOS or offset:
+                    raise
+        shutil.copyfileobj(f_src, f_dst, _COPY_CHUNK_SIZE)
+
+
+def _copy_entry(src: str, dst: str, src_stat: os.stat_result) -> None:
+    if os.path.lexists(dst) and (
+        os.path.islink(dst) or stat.S_ISLNK(src_stat.st_mode) or os.path.isdir(dst)
+    ):
+        _remove_path(dst)
+    if stat.S_ISLNK(src_stat.st_mode):
+        os.symlink(os.readlink(src), dst)
+        os.utime(
+            dst,
+            ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns),
+            follow_symlinks=False,
+        )
+        return
+    # written beside `dst` and moved over it, so that other hardlinks to `dst` keep
+    #  their contents and a failed copy doesn't leave a truncated file behind
+    tmp_path = os.path.join(
+        os.path.dirname(dst), f".{os.path.basename(dst)}.mirror-tmp"
+    )
+    try:
+        _copy_file_contents(src, tmp_path, src_stat.st_size)
+        os.chmod(tmp_path, stat.S_IMODE(src_stat.st_mode))
+        os.utime(tmp_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _remove_path(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+
+def _is_unchanged(src_stat: os.stat_result, dst_stat: Optional[os.stat_result]) -> bool:
+    return (
+        dst_stat is not None
+        and stat.S_IFMT(src_stat.st_mode) == stat.S_IFMT(dst_stat.st_mode)
+        and src_stat.st_size == dst_stat.st_size
+        and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+    )
+
+
+def mirror_tree(
+    src: PathInput,
+    dst: PathInput,
+    workers: Optional[int] = None,
+    delete=False,
+    dry_run=False,
+    progress=True,
+) -> MirrorStats:
+    """
+    Makes `dst` a copy of `src`, only copying files whose size or modified time
+     differ, so re-mirroring an unchanged tree only costs one `scandir` pass over each
+     side.
+
+    Files are copied in-kernel on a thread pool and get their source timestamps via
+     `os.utime` in the same pass; directory timestamps are applied once their
+     contents are written.
+    Only regular files, directories and symlinks are mirrored; other entries (FIFOs,
+     sockets, device nodes) are skipped with a warning.
+    If `delete` is set, paths in `dst` which are not in `src` are removed.
+    Creation times are not copied (use `copy_filedate` for those).
+    """
+    src, dst = os.fspath(src), os.fspath(dst)
+    src_entries = _scan_tree(src)
+    dst_entries = _scan_tree(dst)
+    # FIFOs, sockets and device nodes can't be copied by reading them (a FIFO blocks)
+    for rel_path, src_stat in list(src_entries.items()):
+        mode = src_stat.st_mode
+        if not (stat.S_ISDIR(mode) or stat.S_ISREG(mode) or stat.S_ISLNK(mode)):
+            LOGGER.warning(
+                "Skipping %r: not a regular file, directory or symlink",
+                os.path.join(src, rel_path),
+            )
+            del src_entries[rel_path]
+
+    src_dirs = sorted(
+        rel_path
+        for rel_path, src_stat in src_entries.items()
+        if stat.S_ISDIR(src_stat.st_mode)
+    )
+    to_copy = [
+        rel_path
+        for rel_path, src_stat in src_entries.items()
+        if not stat.S_ISDIR(src_stat.st_mode)
+        and not _is_unchanged(src_stat, dst_entries.get(rel_path))
+    ]
+    to_delete = (
+        sorted(
+            (rel_path for rel_path in dst_entries if rel_path not in src_entries),
+            reverse=True,
+        )
+        if delete
+        else []
+    )
+    bytes_to_copy = sum(src_entries[rel_path].st_size for rel_path in to_copy)
+    stats = MirrorStats(
+        copied=len(to_copy),
+        skipped=len(src_entries) - len(src_dirs) - len(to_copy),
+        deleted=len(to_delete),
+        bytes_copied=bytes_to_copy,
+    )
+    LOGGER.debug("Mirroring %r -> %r: %s", src, dst, stats)
+    if dry_run:
+        return stats
+
+    for rel_path in to_delete:
+        dst_path = os.path.join(dst, rel_path)
+        if os.path.lexists(dst_path):
+            LOGGER.debug("Deleting %r", dst_path)
+            _remove_path(dst_path)
+
+    os.makedirs(dst, exist_ok=True)
+    for rel_path in src_dirs:
+        dst_path = os.path.join(dst, rel_path)
+        if os.path.lexists(dst_path) and not os.path.isdir(dst_path):
+            _remove_path(dst_path)
+        os.makedirs(dst_path, exist_ok=True)
+
+    with tqdm(
+        total=bytes_to_copy,
+        desc=f"Mirroring {src}",
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1024,
+        disable=not progress,
+    ) as pbar:
+
+        def copy_one(rel_path: str) -> None:
+            src_stat = src_entries[rel_path]
+            _copy_entry(
+                os.path.join(src, rel_path), os.path.join(dst, rel_path), src_stat
+            )
+            pbar.update(src_stat.st_size)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(copy_one, to_copy):
+                pass
+
+    # deepest first, so setting a directory's times is not undone by writing into it
+    for rel_path in reversed(src_dirs):
+        src_stat = src_entries[rel_path]
+        os.utime(
+            os.path.join(dst, rel_path),
+            ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns),
+        )
+    return stats
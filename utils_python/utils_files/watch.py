@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Generator, Optional
+
+from utils_python.utils_typing import PathInput
+
+LOGGER = logging.getLogger(__name__)
+
+# from <sys/inotify.h>
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_ATTRIB
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _snapshot_files(root: str) -> dict[str, tuple[int, int]]:
+    files: dict[str, tuple[int, int]] = {}
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    continue
+    return files
+
+
+class _PollingWatcher:
+    def __init__(self, root: str, poll_interval: float) -> None:
+        self.root = root
+        self.poll_interval = poll_interval
+        self.files = _snapshot_files(root)
+        self.next_poll_time = time.monotonic() + poll_interval
+
+    def read_events(self, timeout: float) -> list[tuple[str, bool]]:
+        time.sleep(max(0.0, min(timeout, self.next_poll_time - time.monotonic())))
+        now = time.monotonic()
+        if now < self.next_poll_time:
+            return []
+        self.next_poll_time = now + self.poll_interval
+        files = _snapshot_files(self.root)
+        events = [
+            (path, True) for path, info in files.items() if self.files.get(path) != info
+        ]
+        events.extend((path, False) for path in self.files.keys() - files.keys())
+        self.files = files
+        return events
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWatcher:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.wd_paths: dict[int, str] = {}
+        self._add_tree(root)
+
+    def _add_watch(self, path: str) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        self.wd_paths[wd] = path
+
+    def _add_tree(self, root: str) -> list[str]:
+        """watches `root` and its subdirectories, returning the files found in them"""
+        files = []
+        for dirpath, _dirnames, filenames in os.walk(root):
+            try:
+                self._add_watch(dirpath)
+            except FileNotFoundError:
+                continue
+            files.extend(os.path.join(dirpath, filename) for filename in filenames)
+        return files
+
+    def _remove_tree(self, root: str) -> None:
+        prefix = os.path.join(root, "")
+        for wd, path in list(self.wd_paths.items()):
+            if path == root or path.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.wd_paths[wd]
+
+    def read_events(self, timeout: float) -> list[tuple[str, bool]]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events: list[tuple[str, bool]] = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                LOGGER.warning(
+                    "inotify queue overflowed; treating all files as changed"
+                )
+                self._remove_tree(self.root)
+                events.extend((path, True) for path in self._add_tree(self.root))
+                continue
+            if mask & _IN_IGNORED:
+                self.wd_paths.pop(wd, None)
+                continue
+            parent = self.wd_paths.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    events.extend((file, True) for file in self._add_tree(path))
+                elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                    self._remove_tree(path)
+                    events.append((path, False))
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                events.append((path, False))
+            else:
+                events.append((path, True))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _iter_watcher_changes(
+    watcher: _InotifyWatcher | _PollingWatcher,
+    coalesce_interval: float,
+    max_delay: float,
+) -> Generator[dict[Path, bool] | None, None, None]:
+    pending: dict[Path, bool] = {}
+    first_event_time = last_event_time = 0.0
+    try:
+        # primed by iter_path_changes, so the watcher is closed even if never iterated
+        yield None
+        while True:
+            timeout = coalesce_interval if pending else max(coalesce_interval, 1.0)
+            events = watcher.read_events(timeout)
+            now = time.monotonic()
+            if events:
+                if not pending:
+                    first_event_time = now
+                last_event_time = now
+                for event_path, exists in events:
+                    pending[Path(event_path)] = exists
+            if pending and (
+                now - last_event_time >= coalesce_interval
+                or now - first_event_time >= max_delay
+            ):
+                batch, pending = pending, {}
+                yield batch
+    finally:
+        watcher.close()
+
+
+def iter_path_changes(
+    path: PathInput,
+    coalesce_interval: float = 1.0,
+    max_delay: float = 10.0,
+    use_polling: bool = False,
+    poll_interval: float = 5.0,
+) -> Generator[dict[Path, bool], None, None]:
+    """
+    Watches a directory tree (with inotify on Linux, otherwise by polling) and yields
+     batches of changed files as `{path: exists}`, where `exists` is False for deleted
+     or moved-away paths.
+
+    The watch is set up when this is called rather than on the first `next()`, so
+     changes made in between (e.g. during an initial scan) are still reported.
+    Events are coalesced until none have arrived for `coalesce_interval` seconds (or
+     the oldest is `max_delay` seconds old), so a burst of writes to a file results in
+     a single entry. A deleted or moved-away directory is reported as a single entry.
+    """
+    root = os.path.abspath(path)
+    watcher: _InotifyWatcher | _PollingWatcher
+    if use_polling or not sys.platform.startswith("linux"):
+        watcher = _PollingWatcher(root, poll_interval)
+    else:
+        try:
+            watcher = _InotifyWatcher(root)
+        except (OSError, AttributeError) as exc:
+            LOGGER.warning("Could not use inotify (%s); falling back to polling", exc)
+            watcher = _PollingWatcher(root, poll_interval)
+
+    changes = _iter_watcher_changes(watcher, coalesce_interval, max_delay)
+    next(changes)
+    return changes  # type: ignore[return-value]
+
+
+def watch_path(
+    path: PathInput,
+    file_callback: Optional[Callable[[Path], Any]] = None,
+    delete_callback: Optional[Callable[[Path], Any]] = None,
+    **kwargs,
+) -> None:
+    """
+    Runs `file_callback` on files as they are created/modified/moved into `path`, and
+     `delete_callback` on paths as they are deleted/moved away (see
+     `iter_path_changes`, which takes the same keyword arguments). Runs until
+     interrupted; errors from callbacks are logged rather than stopping the watch.
+    """
+    for changes in iter_path_changes(path, **kwargs):
+        for changed_path, exists in changes.items():
+            callback = file_callback if exists else delete_callback
+            if callback is None or (exists and not changed_path.is_file()):
+                continue
+            try:
+                callback(changed_path)
+            except Exception:
+                LOGGER.exception("ERROR running callback on %r", changed_path)
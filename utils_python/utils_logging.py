@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import atexit
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import OrderedDict
 from contextlib import contextmanager
+from contextvars import ContextVar
 from logging.config import fileConfig
+from logging.handlers import BaseRotatingHandler
 from os import PathLike
 from pathlib import Path
-from typing import Type, TypeVar
+from typing import Any, NamedTuple, Type, TypeVar
 
-from utils_python.utils_files import make_parent_dir
+from utils_python.utils_files import get_rotated_path, make_parent_dir, rotate_file
 from utils_python.utils_typing import PathInput
 
 LOG_DATEFMT = r"%Y-%m-%dT%H:%M:%S"
@@ -27,6 +41,133 @@ class DirCreatingFileHandler(logging.FileHandler):
         return super().__init__(filename, *args, **kwargs)
 
 
+class RotatingDirCreatingFileHandler(BaseRotatingHandler):
+    """
+    Creates the log directory if it doesn't exist, and rotates the log file once it
+     reaches `max_bytes` and/or every `interval` seconds.
+
+    Rotated files are named as by `rotate_file` (`app.log` -> `app.1.log[.gz]`).
+    Compression, renaming and retention are done on a background thread, so the
+     logging thread only pays for closing, renaming and reopening the log file.
+
+    Args:
+        max_bytes: rotate once the log file reaches this size (0 to disable).
+        interval: rotate after this many seconds (None to disable).
+        backup_count: maximum number of rotated files to keep (None for no limit).
+        max_total_bytes: maximum combined size of rotated files (None for no limit);
+         the oldest rotated files are deleted first.
+        compress: gzip rotated files.
+    """
+
+    def __init__(
+        self,
+        filename: str | PathLike[str],
+        mode: str = "a",
+        max_bytes: int = 0,
+        interval: float | None = None,
+        backup_count: int | None = None,
+        max_total_bytes: int | None = None,
+        compress: bool = True,
+        encoding: str | None = None,
+        delay: bool = False,
+        errors: str | None = None,
+    ) -> None:
+        make_parent_dir(filename)
+        if max_bytes > 0:
+            mode = "a"
+        super().__init__(filename, mode, encoding=encoding, delay=delay, errors=errors)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.max_total_bytes = max_total_bytes
+        self.add_extension = ".gz" if compress else None
+        self.rollover_at = self._compute_rollover_at()
+        self._pending: queue.Queue[str | None] = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._process_pending,
+            name=f"{type(self).__name__}({self.baseFilename})",
+            daemon=True,
+        )
+        self._worker.start()
+
+    def _compute_rollover_at(self) -> float | None:
+        if self.interval is None:
+            return None
+        return time.time() + self.interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and record.created >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            # checking the current position rather than formatting the record
+            #  again (as RotatingFileHandler does) keeps this O(1) per record
+            if self.stream.tell() >= self.max_bytes:
+                return True
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+        if os.path.isfile(self.baseFilename):
+            pending_path = f"{self.baseFilename}.{time.time_ns()}.pending"
+            os.rename(self.baseFilename, pending_path)
+            self._pending.put(pending_path)
+        if not self.delay:
+            self.stream = self._open()
+        self.rollover_at = self._compute_rollover_at()
+
+    def _process_pending(self) -> None:
+        while (pending_path := self._pending.get()) is not None:
+            try:
+                self._rotate_pending(Path(pending_path))
+            except Exception:
+                if logging.raiseExceptions:
+                    traceback.print_exc(file=sys.stderr)
+
+    def _rotate_pending(self, pending_path: Path) -> None:
+        if self.add_extension is not None:
+            compressed_path = pending_path.with_name(
+                pending_path.name + self.add_extension
+            )
+            with open(pending_path, "rb") as f_in:
+                with gzip.open(compressed_path, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+            pending_path.unlink()
+            pending_path = compressed_path
+        rotate_file(
+            self.baseFilename,
+            maximum_rotations=self.backup_count,
+            add_extension=self.add_extension,
+            source_path=pending_path,
+        )
+        if self.max_total_bytes is not None:
+            self._enforce_max_total_bytes()
+
+    def _enforce_max_total_bytes(self) -> None:
+        rotated_paths: list[Path] = []
+        i = 1
+        while (
+            path := get_rotated_path(self.baseFilename, i, self.add_extension)
+        ).is_file():
+            rotated_paths.append(path)
+            i += 1
+        total_bytes = sum(path.stat().st_size for path in rotated_paths)
+        while rotated_paths and total_bytes > self.max_total_bytes:
+            path = rotated_paths.pop()
+            total_bytes -= path.stat().st_size
+            path.unlink()
+
+    def close(self) -> None:
+        # wait for outstanding compression/rotation so nothing is left half-done
+        if self._worker.is_alive():
+            self._pending.put(None)
+            self._worker.join()
+        super().close()
+
+
 def setup_config_logging(config_path: PathInput) -> None:
     """
     sets up logging via fileConfig
@@ -62,21 +203,49 @@ def setup_logger(
     datefmt=LOG_DATEFMT,
     level=logging.INFO,
     handler_class: Type[logging.Handler] = logging.StreamHandler,
+    json_lines: bool = False,
+    rate_limit: int | None = None,
+    rate_limit_interval: float = 60.0,
 ):
     """
     sets up and returns a configurable logger, e.g. `LOGGER.info("test")`
+
+    if `json_lines` is True, records are output as JSON objects (one per line)
+     instead of using `format`
+
+    if `rate_limit` is given, at most that many records with the same logger, level
+     and message template are output per `rate_limit_interval` seconds
+     (see `RateLimitFilter`)
+
+    if the `UTILS_PYTHON_PROFILE` environment variable is set, profiling is started
+     with `setup_profiling`, reporting to this logger at exit
     """
     logger = logging.getLogger(name)
 
-    formatter = logging.Formatter(fmt=format, datefmt=datefmt)
+    formatter: logging.Formatter
+    if json_lines:
+        formatter = JsonLinesFormatter(datefmt=datefmt)
+    else:
+        formatter = FastFormatter(fmt=format, datefmt=datefmt)
 
     handler = handler_class()
     handler.setFormatter(formatter)
     handler.setLevel(level)
+    handler.addFilter(LogContextFilter())
+    if rate_limit is not None:
+        handler.addFilter(
+            RateLimitFilter(rate_limit, rate_limit_interval, handler=handler)
+        )
 
     logger.addHandler(handler)
     logger.setLevel(level)
 
+    # imported here, as the profiling module is only needed once a logger is set up
+    from utils_python.utils_profiling import PROFILE_ENV_VAR, setup_profiling
+
+    if os.environ.get(PROFILE_ENV_VAR, "").strip():
+        setup_profiling(logger)
+
     return logger
 
 
@@ -85,6 +254,9 @@ def logPrefixFilter(logger: logging.Logger, msg_prefix: str = ""):
     """
     Temporarily prepends logged messages (if string) with the given string.
 
+    This modifies `record.msg` on a shared logger, so the prefix applies to all
+     threads; see `log_context` for a thread- and asyncio-safe alternative.
+
     Args:
         logger: logger to prepend msg_prefix to.
         msg_prefix: string to prepend to logged messages.
@@ -102,6 +274,297 @@ def logPrefixFilter(logger: logging.Logger, msg_prefix: str = ""):
         logger.removeFilter(_filter)
 
 
+class LogContext(NamedTuple):
+    prefix: str = ""
+    fields: dict[str, Any] = {}
+
+
+_LOG_CONTEXT: ContextVar[LogContext] = ContextVar("log_context", default=LogContext())
+
+
+@contextmanager
+def log_context(msg_prefix: str = "", **fields: Any):
+    """
+    Temporarily prepends logged messages with the given string and attaches the given
+     fields to log records, for the current thread/asyncio task only.
+
+    Nested contexts accumulate prefixes and fields. Records are only tagged by
+     `LogContextFilter` and the prefix is only applied by `LogContextFormatter`
+     (both are installed by `setup_logger`).
+
+    Args:
+        msg_prefix: string to prepend to logged messages.
+        fields: attributes to set on log records, e.g. for use in format strings.
+    """
+    parent = _LOG_CONTEXT.get()
+    token = _LOG_CONTEXT.set(
+        LogContext(
+            prefix=parent.prefix + str(msg_prefix),
+            fields={**parent.fields, **fields} if fields else parent.fields,
+        )
+    )
+    try:
+        yield
+    finally:
+        _LOG_CONTEXT.reset(token)
+
+
+class LogContextFilter(logging.Filter):
+    """
+    Attaches the current `log_context` to records; records which already have one
+     (e.g. from passing through another handler) are left unchanged.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "log_context"):
+            context = _LOG_CONTEXT.get()
+            record.log_context = context
+            for key, value in context.fields.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return True
+
+
+class LogContextFormatter(logging.Formatter):
+    """
+    Prepends the `log_context` prefix attached by `LogContextFilter` to messages at
+     format time, without modifying the record.
+    """
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        context: LogContext | None = getattr(record, "log_context", None)
+        if context is None or not context.prefix:
+            return super().formatMessage(record)
+        message = record.message
+        record.message = context.prefix + message
+        try:
+            return super().formatMessage(record)
+        finally:
+            record.message = message
+
+
+class FastFormatter(LogContextFormatter):
+    """
+    Formatter which caches the formatted timestamp for each second and checks
+     whether the format uses the time once, rather than for every record.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._uses_time = self.usesTime()
+        self._time_cache: tuple[int, str | None, str] = (-1, None, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        second = int(record.created)
+        cached_second, cached_datefmt, time_str = self._time_cache
+        if second != cached_second or datefmt != cached_datefmt:
+            ct = self.converter(second)
+            time_str = time.strftime(datefmt or self.default_time_format, ct)
+            self._time_cache = (second, datefmt, time_str)
+        if datefmt is None and self.default_msec_format:
+            return self.default_msec_format % (time_str, record.msecs)
+        return time_str
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.message = record.getMessage()
+        if self._uses_time:
+            record.asctime = self.formatTime(record, self.datefmt)
+        s = self.formatMessage(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + record.exc_text
+        if record.stack_info:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + self.formatStack(record.stack_info)
+        return s
+
+
+class JsonLinesFormatter(FastFormatter):
+    """
+    Formats records as single-line JSON objects, e.g. for log shipping.
+
+    Fields attached by `log_context` are included alongside the standard fields.
+    """
+
+    def __init__(self, datefmt: str | None = LOG_DATEFMT, default=str) -> None:
+        super().__init__(datefmt=datefmt)
+        self.default = default
+
+    def format(self, record: logging.LogRecord) -> str:
+        time_str = self.formatTime(record, self.datefmt)
+        if self.datefmt:
+            time_str = f"{time_str}.{int(record.msecs):03d}"
+        data: dict[str, Any] = {
+            "time": time_str,
+            "level": record.levelname,
+            "name": record.name,
+            "filename": record.filename,
+            "lineno": record.lineno,
+            "funcName": record.funcName,
+            "message": record.getMessage(),
+        }
+        context: LogContext | None = getattr(record, "log_context", None)
+        if context is not None:
+            if context.prefix:
+                data["prefix"] = context.prefix
+            data.update(context.fields)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=self.default)
+
+
+_RATE_LIMIT_FILTERS: weakref.WeakSet[RateLimitFilter] = weakref.WeakSet()
+
+
+@atexit.register
+def _close_rate_limit_filters() -> None:
+    # registered after logging's own atexit hook, so this runs before handlers close
+    for rate_limit_filter in list(_RATE_LIMIT_FILTERS):
+        rate_limit_filter.close()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Suppresses records beyond `max_repeats` per `interval` seconds which share a
+     logger name, level and message template (i.e. `record.msg` before formatting).
+
+    A "suppressed N similar messages" summary record is sent to `handler` (or to the
+     record's logger if no handler is given) once each interval in which records were
+     suppressed has ended, whether or not more records arrive; pending summaries are
+     also sent when a template is evicted, on `flush()`/`close()` and at exit.
+
+    Only the `max_keys` most recently seen templates are tracked, so memory use is
+     bounded and each record costs O(1).
+    """
+
+    SUMMARY_MSG = "Suppressed %d similar messages (limit %d per %gs): %r"
+
+    def __init__(
+        self,
+        max_repeats: int = 10,
+        interval: float = 60.0,
+        max_keys: int = 1024,
+        handler: logging.Handler | None = None,
+    ) -> None:
+        super().__init__()
+        self.max_repeats = max_repeats
+        self.interval = interval
+        self.max_keys = max_keys
+        self.handler = handler
+        # key -> [window start, records seen in window, records suppressed in window,
+        #  last suppressed record]
+        self._windows: OrderedDict[tuple[str, int, Any], list[Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        _RATE_LIMIT_FILTERS.add(self)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.msg is self.SUMMARY_MSG:
+            return True
+        msg = record.msg if isinstance(record.msg, str) else repr(record.msg)
+        key = (record.name, record.levelno, msg)
+        summaries: list[tuple[logging.LogRecord, int]] = []
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or record.created - window[0] >= self.interval:
+                if window is not None and window[2]:
+                    summaries.append((window[3], window[2]))
+                self._windows[key] = [record.created, 1, 0, None]
+                if window is None and len(self._windows) > self.max_keys:
+                    _, evicted = self._windows.popitem(last=False)
+                    if evicted[2]:
+                        summaries.append((evicted[3], evicted[2]))
+            else:
+                window[1] += 1
+                if window[1] > self.max_repeats:
+                    window[2] += 1
+                    window[3] = record
+                    if self._timer is None:
+                        self._schedule_summaries(window[0] + self.interval)
+                    return False
+            self._windows.move_to_end(key)
+        for summary_record, suppressed in summaries:
+            self._emit_summary(summary_record, suppressed)
+        return True
+
+    def _schedule_summaries(self, due: float) -> None:
+        self._timer = threading.Timer(
+            max(0.0, due - time.time()), self._emit_due_summaries
+        )
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _take_summaries(self, due_before: float | None) -> list[tuple[Any, int]]:
+        """
+        Resets and returns the suppressed counts of windows ending before
+         `due_before` (or of all windows, if None); must be called with the lock held
+        """
+        summaries = []
+        next_due = None
+        for window in self._windows.values():
+            if not window[2]:
+                continue
+            window_end = window[0] + self.interval
+            if due_before is None or window_end <= due_before:
+                summaries.append((window[3], window[2]))
+                window[2] = 0
+                window[3] = None
+            elif next_due is None or window_end < next_due:
+                next_due = window_end
+        if next_due is not None and due_before is not None:
+            self._schedule_summaries(next_due)
+        return summaries
+
+    def _emit_due_summaries(self) -> None:
+        with self._lock:
+            self._timer = None
+            summaries = self._take_summaries(time.time())
+        for summary_record, suppressed in summaries:
+            self._emit_summary(summary_record, suppressed)
+
+    def flush(self) -> None:
+        """
+        Sends summaries for all suppressed records now, without waiting for their
+         intervals to end
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            summaries = self._take_summaries(None)
+        for summary_record, suppressed in summaries:
+            self._emit_summary(summary_record, suppressed)
+
+    def close(self) -> None:
+        self.flush()
+        _RATE_LIMIT_FILTERS.discard(self)
+
+    def _emit_summary(self, record: logging.LogRecord, suppressed: int) -> None:
+        summary = logging.getLogger(record.name).makeRecord(
+            record.name,
+            record.levelno,
+            record.pathname,
+            record.lineno,
+            self.SUMMARY_MSG,
+            (suppressed, self.max_repeats, self.interval, record.msg),
+            None,
+            record.funcName,
+        )
+        if self.handler is not None:
+            self.handler.handle(summary)
+        else:
+            logging.getLogger(record.name).handle(summary)
+
+
 _LoggerType = TypeVar("_LoggerType", bound=logging.Logger)
 
 
@@ -42,5 +42,8 @@ def setup_excepthook(
             logger.critical(
                 "Exception occured:", exc_info=(exc_type, exc_value, exc_traceback)
             )
+            from utils_python.utils_profiling import log_crash_profiling_report
+
+            log_crash_profiling_report(logger)
 
     sys.excepthook = handle_exception
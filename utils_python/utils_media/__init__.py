@@ -1,5 +1,78 @@
-from .easy_id3_keys import *
-from .easy_mp4_keys import *
-from .id3 import *
-from .mp4 import *
-from .common import *
+from typing import TYPE_CHECKING
+
+from utils_python._lazy import lazy_attach
+
+if TYPE_CHECKING:
+    from .easy_id3_keys import *
+    from .easy_mp4_keys import *
+    from .id3 import *
+    from .mp4 import *
+    from .transaction import *
+    from .common import *
+    from .header_tags import *
+    from .index import *
+
+__getattr__, __dir__, __all__ = lazy_attach(
+    __name__,
+    [
+        "easy_id3_keys",
+        "easy_mp4_keys",
+        "id3",
+        "mp4",
+        "transaction",
+        "common",
+        "header_tags",
+        "index",
+    ],
+    {
+        "EasyID3TextKeys": "easy_id3_keys",
+        "EasyID3TXXXKeys": "easy_id3_keys",
+        "EasyID3MiscKeys": "easy_id3_keys",
+        "EasyID3Keys": "easy_id3_keys",
+        "ID3MiscFrameClasses": "easy_id3_keys",
+        "EasyMP4TextKeys": "easy_mp4_keys",
+        "EasyMP4FreeformKeys": "easy_mp4_keys",
+        "EasyMP4IntKeys": "easy_mp4_keys",
+        "EasyMP4IntPairKeys": "easy_mp4_keys",
+        "EasyMP4Keys": "easy_mp4_keys",
+        "get_registered_keys_id3": "id3",
+        "ensure_key_registered_id3_txxx": "id3",
+        "get_tag_text_id3": "id3",
+        "get_tags_id3": "id3",
+        "edit_tags_id3": "id3",
+        "set_tag_text_id3": "id3",
+        "del_tag_text_id3": "id3",
+        "get_registered_keys_mp4": "mp4",
+        "ensure_key_registered_mp4_freeform": "mp4",
+        "get_tag_text_mp4": "mp4",
+        "get_tags_mp4": "mp4",
+        "edit_tags_mp4": "mp4",
+        "set_tag_text_mp4": "mp4",
+        "del_tag_text_mp4": "mp4",
+        "get_tag_text_mp4_multi": "mp4",
+        "TagTransaction": "transaction",
+        "ID3_EXTENSIONS": "common",
+        "MP4_EXTENSIONS": "common",
+        "TagFormat": "common",
+        "TAG_CACHE_SIZE": "common",
+        "ensure_key_registered": "common",
+        "sniff_tag_format": "common",
+        "get_tag_format": "common",
+        "clear_tag_cache": "common",
+        "get_tag": "common",
+        "get_tags": "common",
+        "edit_tags": "common",
+        "set_tag": "common",
+        "del_tag": "common",
+        "read_tags_fast": "header_tags",
+        "TAG_INDEX_SCHEMA": "index",
+        "open_tag_index": "index",
+        "read_all_tags": "index",
+        "index_tags": "index",
+        "remove_from_tag_index": "index",
+        "scan_tags": "index",
+        "watch_tags": "index",
+        "find_files_with_tag": "index",
+        "find_files_missing_tag": "index",
+    },
+)
@@ -1,5 +1,32 @@
-from utils_python.utils_media.id3 import ensure_key_registered_id3_txxx
-from utils_python.utils_media.mp4 import ensure_key_registered_mp4_freeform
+import os
+from contextlib import AbstractContextManager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Literal
+
+from mutagen.easyid3 import EasyID3
+from mutagen.easymp4 import EasyMP4
+from mutagen.id3._util import ID3NoHeaderError
+
+from utils_python.utils_media.id3 import (
+    edit_tags_id3,
+    ensure_key_registered_id3_txxx,
+    get_tags_id3,
+)
+from utils_python.utils_media.mp4 import (
+    edit_tags_mp4,
+    ensure_key_registered_mp4_freeform,
+    get_tags_mp4,
+)
+from utils_python.utils_media.transaction import TagTransaction
+from utils_python.utils_typing import PathInput
+
+ID3_EXTENSIONS = {".mp3"}
+MP4_EXTENSIONS = {".mp4", ".m4a", ".m4b", ".m4p", ".m4v"}
+
+TagFormat = Literal["id3", "mp4"]
+
+TAG_CACHE_SIZE = 256
 
 
 def ensure_key_registered(
@@ -10,3 +37,126 @@ def ensure_key_registered(
 ) -> None:
     ensure_key_registered_id3_txxx(key, desc_id3)
     ensure_key_registered_mp4_freeform(key, name_mp4, mean_mp4)
+
+
+def sniff_tag_format(header: bytes, filepath: PathInput = "") -> TagFormat | None:
+    """
+    Guesses whether a file has ID3 or MP4 tags from its first 12 bytes, falling back
+     to its extension
+    """
+    if header[:3] == b"ID3":
+        return "id3"
+    if header[4:8] == b"ftyp":
+        return "mp4"
+    # MPEG audio frame sync, i.e. an MP3 without an ID3v2 header
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return "id3"
+    suffix = Path(filepath).suffix.lower()
+    if suffix in ID3_EXTENSIONS:
+        return "id3"
+    if suffix in MP4_EXTENSIONS:
+        return "mp4"
+    return None
+
+
+@lru_cache(maxsize=TAG_CACHE_SIZE)
+def _get_tag_format(path: str, mtime_ns: int, size: int) -> TagFormat:
+    with open(path, "rb") as f:
+        header = f.read(12)
+    tag_format = sniff_tag_format(header, path)
+    if tag_format is None:
+        raise ValueError(f"Unsupported file type for tags: {path!r}")
+    return tag_format
+
+
+def get_tag_format(filepath: PathInput) -> TagFormat:
+    """
+    Returns whether a file has ID3 or MP4 tags, sniffing each file (version) once
+    """
+    path = os.fspath(filepath)
+    stat = os.stat(path)
+    return _get_tag_format(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=TAG_CACHE_SIZE)
+def _load_tags(path: str, mtime_ns: int, size: int) -> tuple[TagFormat, Any]:
+    tag_format = _get_tag_format(path, mtime_ns, size)
+    if tag_format == "id3":
+        try:
+            return tag_format, EasyID3(path)
+        except ID3NoHeaderError:
+            return tag_format, EasyID3()
+    return tag_format, EasyMP4(path)
+
+
+def clear_tag_cache() -> None:
+    _get_tag_format.cache_clear()
+    _load_tags.cache_clear()
+
+
+def get_tag(
+    filepath: PathInput,
+    key: str,
+    default: str | None = None,
+    required: bool = False,
+) -> str | None:
+    """
+    Like `get_tag_text_id3`/`get_tag_text_mp4` (by file contents), but keeps the
+     most recently parsed files cached, keyed by path, mtime and size
+    """
+    path = os.fspath(filepath)
+    stat = os.stat(path)
+    tag_format, tags = _load_tags(path, stat.st_mtime_ns, stat.st_size)
+    key = key.lower()
+    if tag_format == "id3":
+        ensure_key_registered_id3_txxx(key)
+    else:
+        ensure_key_registered_mp4_freeform(key)
+    if key in tags and tags[key] != []:
+        [value] = tags[key]
+    else:
+        if required:
+            raise KeyError(key)
+        value = default
+    return value
+
+
+def get_tags(
+    filepath: PathInput,
+    keys: Iterable[str],
+    default: str | None = None,
+    required: bool = False,
+) -> dict[str, str | None]:
+    """
+    Reads several keys from an ID3 or MP4 file (by file contents), parsing it once
+    """
+    if get_tag_format(filepath) == "id3":
+        return get_tags_id3(filepath, keys, default, required)
+    return get_tags_mp4(filepath, keys, default, required)
+
+
+def edit_tags(filepath: PathInput) -> AbstractContextManager[TagTransaction]:
+    """
+    `edit_tags_id3` or `edit_tags_mp4` (by file contents): allows many tags to be
+     set/deleted, saving the file once on exit if any changed
+    """
+    if get_tag_format(filepath) == "id3":
+        return edit_tags_id3(filepath)
+    return edit_tags_mp4(filepath)
+
+
+def set_tag(
+    filepath: PathInput,
+    key: str,
+    value: str | list[str],
+) -> None:
+    with edit_tags(filepath) as tags:
+        tags[key] = value
+
+
+def del_tag(
+    filepath: PathInput,
+    key: str,
+) -> None:
+    with edit_tags(filepath) as tags:
+        del tags[key]
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import logging
+import mmap
+from fnmatch import fnmatch
+from typing import Iterator
+
+from mutagen.easyid3 import EasyID3, date_get, genre_get, original_date_get
+from mutagen.easymp4 import EasyMP4
+from mutagen.id3 import TCON, TDOR, TDRC
+from mutagen.id3._util import ID3NoHeaderError
+
+from utils_python.utils_media.common import TagFormat, sniff_tag_format
+from utils_python.utils_media.easy_id3_keys import (
+    EasyID3MiscKeys,
+    EasyID3TextKeys,
+    EasyID3TXXXKeys,
+)
+from utils_python.utils_media.easy_mp4_keys import (
+    EasyMP4FreeformKeys,
+    EasyMP4IntKeys,
+    EasyMP4IntPairKeys,
+    EasyMP4TextKeys,
+)
+from utils_python.utils_media.id3 import _registered_txxx_keys_id3
+from utils_python.utils_media.mp4 import _registered_freeform_keys_mp4
+from utils_python.utils_typing import PathInput
+
+LOGGER = logging.getLogger(__name__)
+
+_ID3_ENCODINGS = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+_MP4_FREEFORM_MEAN = "com.apple.iTunes"
+
+# `EasyID3MiscKeys` backed by a single text frame, decoded with mutagen's own getter
+_ID3_MISC_TEXT_FRAMES = {
+    "TCON": ("genre", TCON, genre_get),
+    "TDRC": ("date", TDRC, date_get),
+    "TDOR": ("originaldate", TDOR, original_date_get),
+}
+# frames backing the other `EasyID3MiscKeys`, or which mutagen converts into misc
+#  key frames when loading (e.g. TYER into TDRC), so files with them are read with
+#  mutagen
+_ID3_MUTAGEN_FRAMES = {
+    "RVA2",
+    "RVAD",
+    "TDAT",
+    "TIME",
+    "TMCL",
+    "TORY",
+    "TYER",
+    "UFID",
+    "WOAR",
+}
+
+
+class _UnsupportedTags(Exception):
+    pass
+
+
+def _syncsafe_int(data: bytes) -> int:
+    value = 0
+    for byte in data:
+        if byte & 0x80:
+            raise _UnsupportedTags("invalid syncsafe integer")
+        value = (value << 7) | byte
+    return value
+
+
+def _decode_id3_text(data: bytes) -> list[str]:
+    if not data:
+        return []
+    encoding = _ID3_ENCODINGS.get(data[0])
+    if encoding is None:
+        raise _UnsupportedTags(f"unknown text encoding {data[0]}")
+    try:
+        text = data[1:].decode(encoding)
+    except UnicodeDecodeError as exc:
+        raise _UnsupportedTags(str(exc)) from exc
+    values = [value.lstrip("\ufeff") for value in text.split("\x00")]
+    while values and not values[-1]:
+        values.pop()
+    return values
+
+
+def _read_id3(buffer: mmap.mmap) -> dict[str, list[str]]:
+    if buffer[:3] != b"ID3":
+        if buffer[-128:-125] == b"TAG":
+            raise _UnsupportedTags("ID3v1 tag")
+        return {}
+    major_version, flags = buffer[3], buffer[5]
+    if major_version not in (3, 4) or flags & 0xC0:
+        # v2.2, unsynchronisation or extended header
+        raise _UnsupportedTags(f"ID3v2.{major_version} with flags {flags:#x}")
+    end = 10 + _syncsafe_int(buffer[6:10])
+    txxx_keys = {**EasyID3TXXXKeys, **_registered_txxx_keys_id3}
+    tags: dict[str, list[str]] = {}
+    offset = 10
+    while offset + 10 <= end:
+        frame_id = buffer[offset : offset + 4]
+        if frame_id[0] == 0:  # padding
+            break
+        if major_version == 4:
+            size = _syncsafe_int(buffer[offset + 4 : offset + 8])
+            unsupported_flags = buffer[offset + 9] & 0x0F
+        else:
+            size = int.from_bytes(buffer[offset + 4 : offset + 8])
+            unsupported_flags = buffer[offset + 9] & 0xE0
+        data_start = offset + 10
+        offset = data_start + size
+        if offset > end:
+            raise _UnsupportedTags("frame extends beyond tag")
+        frame_id_str = frame_id.decode("latin-1")
+        if frame_id_str in _ID3_MUTAGEN_FRAMES:
+            raise _UnsupportedTags(f"{frame_id_str} frame")
+        if (
+            frame_id_str != "TXXX"
+            and frame_id_str not in EasyID3TextKeys
+            and frame_id_str not in _ID3_MISC_TEXT_FRAMES
+        ):
+            continue
+        if unsupported_flags:
+            # compressed, encrypted, unsynchronised or with a data length indicator
+            raise _UnsupportedTags(f"{frame_id_str} frame flags")
+        values = _decode_id3_text(buffer[data_start:offset])
+        if frame_id_str == "TXXX":
+            if not values:
+                continue
+            desc, *values = values
+            if (key := txxx_keys.get(desc)) is not None:
+                tags[key] = values
+        elif frame_id_str in _ID3_MISC_TEXT_FRAMES:
+            key, frame_class, getter = _ID3_MISC_TEXT_FRAMES[frame_id_str]
+            tags[key] = getter({frame_id_str: frame_class(text=values)}, key)
+        else:
+            tags[EasyID3TextKeys[frame_id_str]] = values
+    return tags
+
+
+def _iter_atoms(
+    buffer: mmap.mmap, start: int, end: int
+) -> Iterator[tuple[bytes, int, int]]:
+    """yields (name, data start, end) of each atom between start and end"""
+    offset = start
+    while offset + 8 <= end:
+        size = int.from_bytes(buffer[offset : offset + 4])
+        name = buffer[offset + 4 : offset + 8]
+        header_size = 8
+        if size == 1:
+            size = int.from_bytes(buffer[offset + 8 : offset + 16])
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise _UnsupportedTags(f"invalid {name!r} atom size")
+        yield name, offset + header_size, offset + size
+        offset += size
+
+
+def _find_atom(
+    buffer: mmap.mmap, start: int, end: int, name: bytes
+) -> tuple[int, int] | None:
+    for atom_name, data_start, atom_end in _iter_atoms(buffer, start, end):
+        if atom_name == name:
+            return data_start, atom_end
+    return None
+
+
+def _read_mp4_data(buffer: mmap.mmap, start: int, end: int) -> list[tuple[int, bytes]]:
+    """returns (type, payload) of each `data` atom in an ilst item"""
+    data = []
+    for name, data_start, atom_end in _iter_atoms(buffer, start, end):
+        if name == b"data":
+            data_type = int.from_bytes(buffer[data_start + 1 : data_start + 4])
+            data.append((data_type, buffer[data_start + 8 : atom_end]))
+    return data
+
+
+def _read_mp4(buffer: mmap.mmap) -> dict[str, list[str]]:
+    if buffer[4:8] != b"ftyp":
+        raise _UnsupportedTags("no ftyp atom")
+    span: tuple[int, int] | None = (0, len(buffer))
+    for name in (b"moov", b"udta", b"meta", b"ilst"):
+        assert span is not None
+        start, end = span
+        if name == b"ilst":
+            start += 4  # meta is a full atom: skip version and flags
+        span = _find_atom(buffer, start, end, name)
+        if span is None:
+            return {}
+    assert span is not None
+
+    freeform_keys = {
+        **{
+            (_MP4_FREEFORM_MEAN, name): key for name, key in EasyMP4FreeformKeys.items()
+        },
+        **_registered_freeform_keys_mp4,
+    }
+    tags: dict[str, list[str]] = {}
+    for name, data_start, atom_end in _iter_atoms(buffer, *span):
+        atom_name = name.decode("latin-1")
+        if atom_name == "----":
+            mean = item_name = None
+            values = []
+            for child, child_start, child_end in _iter_atoms(
+                buffer, data_start, atom_end
+            ):
+                if child == b"mean":
+                    mean = buffer[child_start + 4 : child_end].decode("utf-8")
+                elif child == b"name":
+                    item_name = buffer[child_start + 4 : child_end].decode("utf-8")
+                elif child == b"data":
+                    values.append(buffer[child_start + 8 : child_end].decode("utf-8"))
+            if (key := freeform_keys.get((mean, item_name))) is not None:
+                tags[key] = values
+        elif atom_name in EasyMP4TextKeys:
+            values = []
+            for data_type, payload in _read_mp4_data(buffer, data_start, atom_end):
+                if data_type != 1:
+                    raise _UnsupportedTags(f"{atom_name!r} has data type {data_type}")
+                values.append(payload.decode("utf-8"))
+            tags[EasyMP4TextKeys[atom_name]] = values
+        elif atom_name in EasyMP4IntPairKeys:
+            values = []
+            for _data_type, payload in _read_mp4_data(buffer, data_start, atom_end):
+                track = int.from_bytes(payload[2:4])
+                total = int.from_bytes(payload[4:6])
+                values.append(f"{track}/{total}" if total else f"{track}")
+            tags[EasyMP4IntPairKeys[atom_name]] = values
+        elif atom_name in EasyMP4IntKeys:
+            tags[EasyMP4IntKeys[atom_name]] = [
+                str(int.from_bytes(payload, signed=True))
+                for _data_type, payload in _read_mp4_data(buffer, data_start, atom_end)
+            ]
+    return tags
+
+
+def _get_supported_keys(tag_format: TagFormat) -> set[str]:
+    if tag_format == "id3":
+        return {
+            *EasyID3TextKeys.values(),
+            *EasyID3TXXXKeys.values(),
+            *EasyID3MiscKeys,
+            *_registered_txxx_keys_id3.values(),
+        }
+    return {
+        *EasyMP4TextKeys.values(),
+        *EasyMP4FreeformKeys.values(),
+        *EasyMP4IntKeys.values(),
+        *EasyMP4IntPairKeys.values(),
+        *_registered_freeform_keys_mp4.values(),
+    }
+
+
+def _read_tags_mutagen(
+    filepath: PathInput, tag_format: TagFormat
+) -> dict[str, list[str]]:
+    try:
+        tags = EasyID3(filepath) if tag_format == "id3" else EasyMP4(filepath)
+    except ID3NoHeaderError:
+        return {}
+    supported_keys = _get_supported_keys(tag_format)
+    # misc keys like "performer:*" are patterns, matching e.g. "performer:guitar"
+    key_patterns = [key for key in supported_keys if "*" in key]
+    return {
+        key: value
+        for key, value in tags.items()
+        if key in supported_keys
+        or any(fnmatch(key, pattern) for pattern in key_patterns)
+    }
+
+
+def read_tags_fast(filepath: PathInput) -> dict[str, list[str]]:
+    """
+    Reads text tags by memory-mapping the file and decoding only the ID3v2 block or
+     MP4 `moov/udta/meta/ilst` atom, rather than parsing the whole file with mutagen.
+
+    Only keys in the `EasyID3TextKeys`/`EasyID3TXXXKeys`/`EasyID3MiscKeys` and
+     `EasyMP4TextKeys`/`EasyMP4FreeformKeys`/`EasyMP4IntKeys`/`EasyMP4IntPairKeys`
+     tables (and keys registered with `ensure_key_registered`) are read. Files using
+     features this reader doesn't handle (e.g. ID3v2.2, unsynchronisation, compressed
+     frames, or the frames behind misc keys other than genre and dates) are read with
+     mutagen instead, returning the same keys.
+    """
+    with open(filepath, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            raise ValueError(f"Unsupported file type for tags: {filepath!r}")
+        with buffer:
+            tag_format = sniff_tag_format(buffer[:12], filepath)
+            if tag_format is None:
+                raise ValueError(f"Unsupported file type for tags: {filepath!r}")
+            try:
+                if tag_format == "id3":
+                    return _read_id3(buffer)
+                return _read_mp4(buffer)
+            except (_UnsupportedTags, UnicodeDecodeError, IndexError) as exc:
+                LOGGER.debug("Reading %r with mutagen: %s", filepath, exc)
+    return _read_tags_mutagen(filepath, tag_format)
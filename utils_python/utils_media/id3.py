@@ -1,10 +1,16 @@
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Generator, Iterable
 
 from mutagen.easyid3 import EasyID3
-from mutagen.id3 import ID3
 from mutagen.id3._util import ID3NoHeaderError
-from mutagen.mp3 import MP3
 
+from utils_python.utils_media.easy_id3_keys import (
+    EasyID3MiscKeys,
+    EasyID3TextKeys,
+    EasyID3TXXXKeys,
+)
+from utils_python.utils_media.transaction import TagTransaction
 from utils_python.utils_typing import PathInput
 
 
@@ -12,14 +18,31 @@ def get_registered_keys_id3() -> set[str]:
     return EasyID3.Get.keys() & EasyID3.Set.keys() & EasyID3.Delete.keys()
 
 
+# keys known to be registered, so that checking a key is O(1); only refreshed from
+#  mutagen's tables on a miss, in case keys were registered with EasyID3 directly
+_registered_keys_id3: set[str] = {
+    *EasyID3TextKeys.values(),
+    *EasyID3TXXXKeys.values(),
+    *EasyID3MiscKeys,
+} & get_registered_keys_id3()
+# TXXX descriptions of keys registered by `ensure_key_registered_id3_txxx`
+_registered_txxx_keys_id3: dict[str, str] = {}
+
+
 def ensure_key_registered_id3_txxx(
     key: str,
     desc: str | None = None,
 ) -> None:
+    if key in _registered_keys_id3:
+        return
+    _registered_keys_id3.update(get_registered_keys_id3())
+    if key in _registered_keys_id3:
+        return
     if desc is None:
         desc = key.upper()
-    if not key in get_registered_keys_id3():
-        EasyID3.RegisterTXXXKey(key, desc)
+    EasyID3.RegisterTXXXKey(key, desc)
+    _registered_keys_id3.add(key)
+    _registered_txxx_keys_id3[desc] = key
 
 
 def get_tag_text_id3(
@@ -41,33 +64,65 @@ def get_tag_text_id3(
     return value
 
 
-def set_tag_text_id3(
+def get_tags_id3(
     filepath: PathInput,
-    key: str,
-    value: str | list[str],
-) -> None:
+    keys: Iterable[str],
+    default: str | None = None,
+    required: bool = False,
+) -> dict[str, str | None]:
+    """
+    Like `get_tag_text_id3`, but reads several keys while parsing the file once
+    """
     filepath = Path(filepath)
-    key = key.lower()
-    ensure_key_registered_id3_txxx(key)
+    keys = [key.lower() for key in keys]
+    for key in keys:
+        ensure_key_registered_id3_txxx(key)
     try:
         id3 = EasyID3(filepath)
     except ID3NoHeaderError:
-        mp3 = MP3(filepath)
-        mp3.add_tags(ID3=ID3)
-        mp3.save()
+        # as in `get_tag`, a file without a header has no tags
+        id3 = EasyID3()
+    values: dict[str, str | None] = {}
+    for key in keys:
+        if key in id3 and id3[key] != []:
+            [values[key]] = id3[key]
+        else:
+            if required:
+                raise KeyError(key)
+            values[key] = default
+    return values
+
+
+@contextmanager
+def edit_tags_id3(filepath: PathInput) -> Generator[TagTransaction, None, None]:
+    """
+    Allows many tags to be set/deleted, saving the file once on exit if any changed,
+     e.g. `with edit_tags_id3(path) as tags: tags["title"] = "..."`
+    """
+    filepath = Path(filepath)
+    try:
         id3 = EasyID3(filepath)
-    id3[key] = value
-    id3.save()
+    except ID3NoHeaderError:
+        # saving a new tag to the file adds the header, so no separate save is needed
+        id3 = EasyID3()
+    tags = TagTransaction(id3, ensure_key_registered_id3_txxx)
+    yield tags
+    if tags.changed:
+        id3.save(filepath)
+
+
+def set_tag_text_id3(
+    filepath: PathInput,
+    key: str,
+    value: str | list[str],
+) -> None:
+    with edit_tags_id3(filepath) as tags:
+        tags[key] = value
 
 
 def del_tag_text_id3(
     filepath: PathInput,
     key: str,
 ) -> None:
-    filepath = Path(filepath)
-    key = key.lower()
-    ensure_key_registered_id3_txxx(key)
-    id3 = EasyID3(filepath)
-    if key in id3:
-        del id3[key]
-    id3.save()
+    with edit_tags_id3(filepath) as tags:
+        del tags[key]
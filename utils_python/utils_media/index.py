@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from mutagen.easyid3 import EasyID3
+from mutagen.easymp4 import EasyMP4
+from mutagen.id3._util import ID3NoHeaderError
+from tqdm import tqdm
+
+from utils_python.utils_files import iter_path_changes, run_on_path_flat
+from utils_python.utils_media.common import (
+    ID3_EXTENSIONS,
+    MP4_EXTENSIONS,
+    ensure_key_registered,
+    get_tag_format,
+)
+from utils_python.utils_typing import PathInput
+
+LOGGER = logging.getLogger(__name__)
+
+TAG_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS tags (
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tags_path_key ON tags (path, key);
+CREATE INDEX IF NOT EXISTS tags_key_value ON tags (key, value);
+"""
+
+# below this many files, reading tags in a process pool costs more than it saves
+_MIN_FILES_FOR_POOL = 32
+
+
+def open_tag_index(db_path: PathInput) -> sqlite3.Connection:
+    """
+    Opens (creating if needed) a SQLite tag index as written by `scan_tags`
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(TAG_INDEX_SCHEMA)
+    return conn
+
+
+def read_all_tags(filepath: PathInput) -> dict[str, list[str]]:
+    """
+    Reads every registered EasyID3/EasyMP4 key present in the file (by file contents)
+    """
+    filepath = Path(filepath)
+    if get_tag_format(filepath) == "id3":
+        try:
+            return dict(EasyID3(filepath))
+        except ID3NoHeaderError:
+            return {}
+    return dict(EasyMP4(filepath))
+
+
+def _register_keys(keys: Iterable[str]) -> None:
+    for key in keys:
+        ensure_key_registered(key)
+
+
+def _read_file_for_index(
+    path: str,
+) -> tuple[str, int | None, int, dict[str, list[str]], str | None]:
+    """
+    Returns `(path, size, mtime_ns, tags, error)`, with `size=None` if the file no
+     longer exists
+    """
+    size, mtime_ns = 0, 0
+    try:
+        stat = os.stat(path)
+        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        tags = read_all_tags(path)
+        error = None
+    except FileNotFoundError:
+        return path, None, 0, {}, None
+    except Exception as exc:
+        tags = {}
+        error = f"{type(exc).__name__}: {exc}"
+    return path, size, mtime_ns, tags, error
+
+
+def index_tags(
+    conn: sqlite3.Connection,
+    filepaths: Iterable[PathInput],
+    extra_keys: Iterable[str] = (),
+    workers: int | None = None,
+) -> int:
+    """
+    Reads all tags of the given files (in a process pool, for more than a few files)
+     and replaces their entries in the tag index. Returns the number of files indexed.
+    Files which no longer exist are removed from the index instead.
+
+    `extra_keys` are registered (with `ensure_key_registered`) in each worker, so that
+     custom TXXX/freeform keys are read too.
+    """
+    paths = [str(filepath) for filepath in filepaths]
+    extra_keys = list(extra_keys)
+    _register_keys(extra_keys)
+    if workers == 1 or len(paths) < _MIN_FILES_FOR_POOL:
+        results = map(_read_file_for_index, paths)
+        executor = None
+    else:
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_register_keys, initargs=(extra_keys,)
+        )
+        chunksize = max(1, min(256, len(paths) // (4 * workers)))
+        results = executor.map(_read_file_for_index, paths, chunksize=chunksize)
+    vanished: list[str] = []
+    try:
+        with conn:
+            for path, size, mtime_ns, tags, error in tqdm(
+                results, total=len(paths), unit="file", mininterval=0.5
+            ):
+                if size is None:
+                    vanished.append(path)
+                    continue
+                if error is not None:
+                    LOGGER.warning("Could not read tags from %r: %s", path, error)
+                conn.execute("DELETE FROM tags WHERE path = ?", (path,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    (path, size, mtime_ns, error),
+                )
+                conn.executemany(
+                    "INSERT INTO tags VALUES (?, ?, ?)",
+                    (
+                        (path, key, value)
+                        for key, values in tags.items()
+                        for value in values
+                    ),
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    if vanished:
+        LOGGER.debug("%d files no longer exist, removing them", len(vanished))
+        remove_from_tag_index(conn, vanished)
+    return len(paths) - len(vanished)
+
+
+def remove_from_tag_index(
+    conn: sqlite3.Connection,
+    filepaths: Iterable[PathInput],
+) -> None:
+    paths = [(str(filepath),) for filepath in filepaths]
+    with conn:
+        conn.executemany("DELETE FROM tags WHERE path = ?", paths)
+        conn.executemany("DELETE FROM files WHERE path = ?", paths)
+
+
+def scan_tags(
+    directory: PathInput,
+    db_path: PathInput,
+    extra_keys: Iterable[str] = (),
+    workers: int | None = None,
+) -> sqlite3.Connection:
+    """
+    Indexes the tags of all ID3/MP4 files under `directory` into a SQLite database,
+     only re-reading files whose size or mtime changed since the last scan, and
+     removing files which no longer exist. Returns the open index connection.
+    """
+    directory = Path(directory).resolve()
+    conn = open_tag_index(db_path)
+    extensions = ID3_EXTENSIONS | MP4_EXTENSIONS
+
+    def _stat_media_file(path: Path) -> os.stat_result | None:
+        if path.suffix.lower() not in extensions:
+            return None
+        try:
+            return path.stat()
+        except FileNotFoundError:
+            return None
+
+    path_infos = run_on_path_flat(directory, file_callback=_stat_media_file)
+    current = {
+        str(path): path_info["result"]
+        for path, path_info in path_infos.items()
+        if path_info.get("result") is not None
+    }
+
+    prefix = os.path.join(str(directory), "")
+    indexed = {
+        path: (size, mtime_ns)
+        for path, size, mtime_ns in conn.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+    }
+    changed = [
+        path
+        for path, stat in current.items()
+        if indexed.get(path) != (stat.st_size, stat.st_mtime_ns)
+    ]
+    removed = indexed.keys() - current.keys()
+    LOGGER.info(
+        "%d media files under %s: %d new/changed, %d removed",
+        len(current),
+        directory,
+        len(changed),
+        len(removed),
+    )
+    remove_from_tag_index(conn, removed)
+    index_tags(conn, changed, extra_keys, workers)
+    return conn
+
+
+def watch_tags(
+    directory: PathInput,
+    db_path: PathInput,
+    extra_keys: Iterable[str] = (),
+    workers: int | None = None,
+    **kwargs,
+) -> None:
+    """
+    Brings the tag index for `directory` up to date with `scan_tags`, then keeps it
+     updated as files change (see `iter_path_changes`, which takes the same keyword
+     arguments). Runs until interrupted.
+    The watch is set up before the scan, so changes made while scanning are applied
+     once it finishes.
+    """
+    extra_keys = list(extra_keys)
+    changes_iter = iter_path_changes(Path(directory).resolve(), **kwargs)
+    try:
+        conn = scan_tags(directory, db_path, extra_keys, workers)
+    except BaseException:
+        changes_iter.close()
+        raise
+    extensions = ID3_EXTENSIONS | MP4_EXTENSIONS
+    try:
+        for changes in changes_iter:
+            try:
+                _update_tag_index(conn, changes, extensions, extra_keys, workers)
+            except Exception:
+                # one failed batch shouldn't stop the watch; its files are re-read
+                #  on the next change or scan
+                LOGGER.exception("Could not update the tag index")
+    finally:
+        changes_iter.close()
+        conn.close()
+
+
+def _update_tag_index(
+    conn: sqlite3.Connection,
+    changes: dict[Path, bool],
+    extensions: set[str],
+    extra_keys: list[str],
+    workers: int | None,
+) -> None:
+    changed = [
+        path
+        for path, exists in changes.items()
+        if exists and path.suffix.lower() in extensions and path.is_file()
+    ]
+    removed = []
+    for path, exists in changes.items():
+        if exists:
+            continue
+        # deleted directories are reported as a single path
+        prefix = os.path.join(str(path), "")
+        removed.extend(
+            row[0]
+            for row in conn.execute(
+                "SELECT path FROM files WHERE path = ? OR substr(path, 1, ?) = ?",
+                (str(path), len(prefix), prefix),
+            )
+        )
+    if removed:
+        remove_from_tag_index(conn, removed)
+    if changed:
+        index_tags(conn, changed, extra_keys, workers)
+    LOGGER.info("Tag index updated: %d changed, %d removed", len(changed), len(removed))
+
+
+def find_files_with_tag(
+    conn: sqlite3.Connection,
+    key: str,
+    value: str | None = None,
+) -> list[Path]:
+    if value is None:
+        rows = conn.execute(
+            "SELECT DISTINCT path FROM tags WHERE key = ?", (key.lower(),)
+        )
+    else:
+        rows = conn.execute(
+            "SELECT DISTINCT path FROM tags WHERE key = ? AND value = ?",
+            (key.lower(), value),
+        )
+    return [Path(path) for (path,) in rows]
+
+
+def find_files_missing_tag(conn: sqlite3.Connection, key: str) -> list[Path]:
+    rows = conn.execute(
+        "SELECT path FROM files WHERE NOT EXISTS "
+        "(SELECT 1 FROM tags WHERE tags.path = files.path AND tags.key = ?)",
+        (key.lower(),),
+    )
+    return [Path(path) for (path,) in rows]
@@ -1,7 +1,11 @@
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Generator, Iterable
 
 from mutagen.easymp4 import EasyMP4, EasyMP4Tags
 
+from utils_python.utils_media.easy_mp4_keys import EasyMP4Keys
+from utils_python.utils_media.transaction import TagTransaction
 from utils_python.utils_typing import PathInput
 
 
@@ -9,15 +13,28 @@ def get_registered_keys_mp4() -> set[str]:
     return EasyMP4.Get.keys() & EasyMP4.Set.keys() & EasyMP4.Delete.keys()
 
 
+# keys known to be registered, so that checking a key is O(1); only refreshed from
+#  mutagen's tables on a miss, in case keys were registered with EasyMP4 directly
+_registered_keys_mp4: set[str] = {*EasyMP4Keys.values()} & get_registered_keys_mp4()
+# (mean, name) of keys registered by `ensure_key_registered_mp4_freeform`
+_registered_freeform_keys_mp4: dict[tuple[str, str], str] = {}
+
+
 def ensure_key_registered_mp4_freeform(
     key: str,
     name: str | None = None,
     mean: str = "com.apple.iTunes",
 ) -> None:
+    if key in _registered_keys_mp4:
+        return
+    _registered_keys_mp4.update(get_registered_keys_mp4())
+    if key in _registered_keys_mp4:
+        return
     if name is None:
         name = key.upper()
-    if not key in get_registered_keys_mp4():
-        EasyMP4Tags.RegisterFreeformKey(key, name, mean)
+    EasyMP4Tags.RegisterFreeformKey(key, name, mean)
+    _registered_keys_mp4.add(key)
+    _registered_freeform_keys_mp4[(mean, name)] = key
 
 
 def get_tag_text_mp4(
@@ -39,31 +56,61 @@ def get_tag_text_mp4(
     return value
 
 
+def get_tags_mp4(
+    filepath: PathInput,
+    keys: Iterable[str],
+    default: str | None = None,
+    required: bool = False,
+) -> dict[str, str | None]:
+    """
+    Like `get_tag_text_mp4`, but reads several keys while parsing the file once
+    """
+    filepath = Path(filepath)
+    keys = [key.lower() for key in keys]
+    for key in keys:
+        ensure_key_registered_mp4_freeform(key)
+    mp4 = EasyMP4(filepath)
+    values: dict[str, str | None] = {}
+    for key in keys:
+        if key in mp4 and mp4[key] != []:
+            [values[key]] = mp4[key]
+        else:
+            if required:
+                raise KeyError(key)
+            values[key] = default
+    return values
+
+
+@contextmanager
+def edit_tags_mp4(filepath: PathInput) -> Generator[TagTransaction, None, None]:
+    """
+    Allows many tags to be set/deleted, saving the file once on exit if any changed,
+     e.g. `with edit_tags_mp4(path) as tags: tags["title"] = "..."`
+    """
+    mp4 = EasyMP4(Path(filepath))
+    if mp4.tags is None:
+        mp4.add_tags()
+    tags = TagTransaction(mp4, ensure_key_registered_mp4_freeform)
+    yield tags
+    if tags.changed:
+        mp4.save()
+
+
 def set_tag_text_mp4(
     filepath: PathInput,
     key: str,
     value: str | list[str],
 ) -> None:
-
-    filepath = Path(filepath)
-    key = key.lower()
-    ensure_key_registered_mp4_freeform(key)
-    mp4 = EasyMP4(filepath)
-    mp4[key] = value
-    mp4.save()
+    with edit_tags_mp4(filepath) as tags:
+        tags[key] = value
 
 
 def del_tag_text_mp4(
     filepath: PathInput,
     key: str,
 ) -> None:
-    filepath = Path(filepath)
-    key = key.lower()
-    ensure_key_registered_mp4_freeform(key)
-    mp4 = EasyMP4(filepath)
-    if key in mp4:
-        del mp4[key]
-    mp4.save()
+    with edit_tags_mp4(filepath) as tags:
+        del tags[key]
 
 
 def get_tag_text_mp4_multi(
@@ -0,0 +1,68 @@
+from typing import Any, Callable, Iterable, Mapping
+
+
+class TagTransaction:
+    """
+    Collects tag changes for `edit_tags`/`edit_tags_id3`/`edit_tags_mp4`, which save
+     the file once on exit, and only if a value actually changed.
+
+    Keys are lowercased and registered (as with `set_tag_text_id3` etc.) on use;
+     setting a key to its current value or deleting a missing key is a no-op.
+    """
+
+    def __init__(
+        self,
+        tags: Any,
+        ensure_key_registered: Callable[[str], None],
+    ) -> None:
+        self.tags = tags
+        self.ensure_key_registered = ensure_key_registered
+        self.changed = False
+
+    def _key(self, key: str) -> str:
+        key = key.lower()
+        self.ensure_key_registered(key)
+        return key
+
+    def __contains__(self, key: str) -> bool:
+        return self._key(key) in self.tags
+
+    def __getitem__(self, key: str) -> list[str]:
+        return self.tags[self._key(key)]
+
+    def __setitem__(self, key: str, value: str | list[str]) -> None:
+        key = self._key(key)
+        new_value = [value] if isinstance(value, str) else list(value)
+        if key in self.tags and self.tags[key] == new_value:
+            return
+        self.tags[key] = new_value
+        self.changed = True
+
+    def __delitem__(self, key: str) -> None:
+        key = self._key(key)
+        if key in self.tags:
+            del self.tags[key]
+            self.changed = True
+
+    def get(
+        self,
+        key: str,
+        default: str | None = None,
+        required: bool = False,
+    ) -> str | None:
+        key = self._key(key)
+        if key in self.tags and self.tags[key] != []:
+            [value] = self.tags[key]
+        else:
+            if required:
+                raise KeyError(key)
+            value = default
+        return value
+
+    def update(self, values: Mapping[str, str | list[str]]) -> None:
+        for key, value in values.items():
+            self[key] = value
+
+    def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            del self[key]
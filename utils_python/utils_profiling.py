@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import atexit
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import ContextDecorator
+from typing import NamedTuple
+
+LOGGER = logging.getLogger(__name__)
+
+PROFILE_ENV_VAR = "UTILS_PYTHON_PROFILE"
+
+
+class BlockTiming(NamedTuple):
+    count: int
+    total: float
+    max: float
+
+
+_timings: dict[str, BlockTiming] = {}
+_timings_lock = threading.Lock()
+_profiler: cProfile.Profile | None = None
+_exit_report_logger: logging.Logger | None = None
+_exit_report_pending = False
+
+
+class profile_block(ContextDecorator):
+    """
+    Times a block (`with profile_block("name"):`) or function (`@profile_block("name")`)
+     into a process-wide registry, reported by `log_profiling_report`
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._start_times = threading.local()
+
+    def __enter__(self) -> profile_block:
+        stack = self._start_times.__dict__.setdefault("stack", [])
+        stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self._start_times.stack.pop()
+        with _timings_lock:
+            count, total, max_ = _timings.get(self.name, (0, 0.0, 0.0))
+            _timings[self.name] = BlockTiming(
+                count + 1, total + elapsed, max(max_, elapsed)
+            )
+
+
+def get_block_timings() -> dict[str, BlockTiming]:
+    with _timings_lock:
+        return dict(_timings)
+
+
+def reset_profiling() -> None:
+    with _timings_lock:
+        _timings.clear()
+    if _profiler is not None:
+        _profiler.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.clear_traces()
+
+
+def is_profiling() -> bool:
+    return bool(_timings) or _profiler is not None or tracemalloc.is_tracing()
+
+
+def setup_profiling(
+    logger: logging.Logger | None = None,
+    cprofile: bool | None = None,
+    trace_malloc: bool | None = None,
+    report_at_exit: bool = True,
+) -> None:
+    """
+    Starts cProfile and/or tracemalloc capture, by default as given by the
+     comma-separated `UTILS_PYTHON_PROFILE` environment variable
+     (e.g. `UTILS_PYTHON_PROFILE=cprofile,tracemalloc`), and logs a report at exit.
+    """
+    global _profiler, _exit_report_logger, _exit_report_pending
+    enabled = {
+        value.strip().lower()
+        for value in os.environ.get(PROFILE_ENV_VAR, "").split(",")
+        if value.strip()
+    }
+    if cprofile is None:
+        cprofile = "cprofile" in enabled
+    if trace_malloc is None:
+        trace_malloc = "tracemalloc" in enabled
+    if cprofile and _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if trace_malloc and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if report_at_exit:
+        _exit_report_logger = logger
+        if not _exit_report_pending:
+            _exit_report_pending = True
+            atexit.register(_log_exit_profiling_report)
+
+
+def _log_exit_profiling_report() -> None:
+    global _exit_report_pending
+    if _exit_report_pending:
+        _exit_report_pending = False
+        log_profiling_report(_exit_report_logger)
+
+
+def log_crash_profiling_report(logger: logging.Logger | None = None) -> None:
+    """
+    Logs the profiling report (if anything is being profiled) when a run crashes,
+     instead of at exit; used by `setup_excepthook`
+    """
+    global _exit_report_pending
+    if is_profiling():
+        _exit_report_pending = False
+        log_profiling_report(logger)
+
+
+def log_profiling_report(
+    logger: logging.Logger | None = None,
+    top: int = 20,
+    level: int = logging.INFO,
+) -> None:
+    """
+    Logs per-block timings, and the top functions (by cumulative time) and top
+     allocation sites if cProfile/tracemalloc capture is running
+    """
+    if logger is None:
+        logger = LOGGER
+    timings = get_block_timings()
+    if timings:
+        lines = [
+            f"{timing.total:10.4f}s total {timing.count:8d} calls "
+            f"{timing.total / timing.count:10.6f}s mean {timing.max:10.6f}s max  {name}"
+            for name, timing in sorted(
+                timings.items(), key=lambda item: item[1].total, reverse=True
+            )
+        ]
+        logger.log(level, "Block timings:\n%s", "\n".join(lines))
+    if _profiler is not None:
+        _profiler.disable()
+        stream = io.StringIO()
+        stats = pstats.Stats(_profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        _profiler.enable()
+        logger.log(level, "Top functions:\n%s", stream.getvalue())
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        lines = [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+        current, peak = tracemalloc.get_traced_memory()
+        logger.log(
+            level,
+            "Top allocation sites (current %d bytes, peak %d bytes):\n%s",
+            current,
+            peak,
+            "\n".join(lines),
+        )
@@ -1,9 +1,26 @@
 from __future__ import annotations
 
 import logging
+import multiprocessing
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Iterator, Literal, TypeVar
 
-import requests
 from tqdm import tqdm
 
 from .utils_logging import setup_logger
@@ -11,6 +28,9 @@ from .utils_typing import PathInput, copy_signature
 
 LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
 
 class TqdmLoggingHandler(logging.StreamHandler):
     # https://stackoverflow.com/a/67257516
@@ -30,6 +50,68 @@ class TqdmLoggingHandler(logging.StreamHandler):
             self.handleError(record)
 
 
+class BufferedTqdmLoggingHandler(TqdmLoggingHandler):
+    """
+    TqdmLoggingHandler which coalesces records emitted within `flush_interval`
+     seconds into a single `tqdm.write` call, so progress bars are cleared and
+     redrawn once per batch rather than once per record.
+
+    Records at or above `flush_level` flush the buffer immediately, as does
+     reaching `capacity` buffered records; order of output is preserved.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        flush_interval: float = 0.1,
+        flush_level: int = logging.WARNING,
+        capacity: int = 1000,
+    ) -> None:
+        super().__init__(stream)
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.capacity = capacity
+        self.buffer: list[str] = []
+        self._timer: threading.Timer | None = None
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+            return
+        self.buffer.append(msg)
+        if record.levelno >= self.flush_level or len(self.buffer) >= self.capacity:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.buffer:
+                return
+            msgs, self.buffer = self.buffer, []
+            try:
+                tqdm.write(self.terminator.join(msgs), end=self.terminator)
+            except RecursionError:
+                raise
+            except Exception:
+                self.handleError(
+                    logging.makeLogRecord({"msg": msgs[0], "levelno": logging.ERROR})
+                )
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
 @copy_signature(setup_logger)
 def setup_tqdm_logger(*args, **kwargs):
     assert (
@@ -38,6 +120,14 @@ def setup_tqdm_logger(*args, **kwargs):
     return setup_logger(*args, **kwargs, handler_class=TqdmLoggingHandler)
 
 
+@copy_signature(setup_logger)
+def setup_buffered_tqdm_logger(*args, **kwargs):
+    assert (
+        kwargs.get("handler_class") is None
+    ), "setup_buffered_tqdm_logger uses its own handler_class; use setup_logger if you wish to specify it"
+    return setup_logger(*args, **kwargs, handler_class=BufferedTqdmLoggingHandler)
+
+
 @copy_signature(print)
 def print_tqdm(*args, **kwargs):
     if "flush" in kwargs:
@@ -54,6 +144,8 @@ def download_tqdm(
     leave: bool = False,
 ) -> None:
     # https://stackoverflow.com/questions/37573483/progress-bar-while-download-file-over-http-with-requests/37573701#37573701
+    import requests
+
     filepath = Path(filepath)
 
     # Streaming, so we can iterate over the response.
@@ -77,3 +169,149 @@ def download_tqdm(
 
     if total_size != 0 and progress_bar.n != total_size:
         raise RuntimeError("Could not download file")
+
+
+@contextmanager
+def redirect_logging_to_tqdm(
+    loggers: Iterable[logging.Logger] | None = None,
+) -> Generator[None, None, None]:
+    """
+    Temporarily replaces console StreamHandlers of the given loggers (default: the
+     root logger) with TqdmLoggingHandlers, keeping their level, formatter and filters
+    """
+    if loggers is None:
+        loggers = [logging.getLogger()]
+    replaced: list[tuple[logging.Logger, logging.Handler, logging.Handler]] = []
+    for logger in loggers:
+        for handler in logger.handlers:
+            if type(handler) is not logging.StreamHandler or handler.stream not in (
+                sys.stdout,
+                sys.stderr,
+            ):
+                continue
+            tqdm_handler = TqdmLoggingHandler(handler.stream)
+            tqdm_handler.setLevel(handler.level)
+            tqdm_handler.setFormatter(handler.formatter)  # type: ignore[arg-type]
+            tqdm_handler.filters = handler.filters
+            replaced.append((logger, handler, tqdm_handler))
+    for logger, handler, tqdm_handler in replaced:
+        logger.removeHandler(handler)
+        logger.addHandler(tqdm_handler)
+    try:
+        yield
+    finally:
+        for logger, handler, tqdm_handler in replaced:
+            logger.removeHandler(tqdm_handler)
+            logger.addHandler(handler)
+
+
+class _ForwardingHandler(logging.Handler):
+    """passes records from worker processes to the parent's loggers"""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+        return True
+
+
+def _init_worker_logging(queue: Any, level: int) -> None:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(queue))
+    root.setLevel(level)
+
+
+def _apply_chunk(fn: Callable[[_T], _R], chunk: list[_T]) -> list[_R]:
+    results = []
+    for item in chunk:
+        try:
+            results.append(fn(item))
+        except Exception as exc:
+            exc.add_note(f"tqdm_map: raised by {fn!r} for item {item!r}")
+            raise
+    return results
+
+
+def tqdm_map(
+    fn: Callable[[_T], _R],
+    iterable: Iterable[_T],
+    workers: int | None = None,
+    kind: Literal["thread", "process"] = "thread",
+    ordered: bool = True,
+    chunksize: int = 1,
+    total: int | None = None,
+    **tqdm_kwargs,
+) -> Iterator[_R]:
+    """
+    Like `map(fn, iterable)`, but calls `fn` in a thread or process pool and shows a
+     single progress bar, updated as calls complete.
+
+    Inputs are read from `iterable` as workers become free rather than all at once,
+     in chunks of `chunksize`. Log records (from threads, or forwarded from worker
+     processes) are written with TqdmLoggingHandler so they don't corrupt the bar.
+    If a call raises, outstanding work is cancelled and the exception is re-raised
+     with a note of the failing item.
+    """
+    if total is None and hasattr(iterable, "__len__"):
+        total = len(iterable)  # type: ignore[arg-type]
+    if kind not in ("thread", "process"):
+        raise ValueError(f"{kind=!r} must be 'thread' or 'process'")
+    max_workers = workers or os.cpu_count() or 1
+    executor: Executor
+    listener: QueueListener | None = None
+    if kind == "process":
+        queue = multiprocessing.get_context().Queue()
+        listener = QueueListener(queue, _ForwardingHandler())
+        listener.start()
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker_logging,
+            initargs=(queue, logging.getLogger().getEffectiveLevel()),
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    max_in_flight = 2 * max_workers
+    items = iter(iterable)
+    pending: deque[Future[list[_R]]] = deque()
+
+    with (
+        redirect_logging_to_tqdm(),
+        tqdm(total=total, **tqdm_kwargs) as pbar,
+    ):
+
+        def update_pbar(future: Future[list[_R]], n: int) -> None:
+            if not future.cancelled() and future.exception() is None:
+                pbar.update(n)
+
+        def submit_chunks() -> None:
+            while len(pending) < max_in_flight:
+                chunk = list(islice(items, chunksize))
+                if not chunk:
+                    return
+                future = executor.submit(_apply_chunk, fn, chunk)
+                future.add_done_callback(partial(update_pbar, n=len(chunk)))
+                pending.append(future)
+
+        try:
+            submit_chunks()
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done_set, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [future for future in pending if future in done_set]
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    results = future.result()
+                    submit_chunks()
+                    yield from results
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            if listener is not None:
+                listener.stop()